@@ -1,20 +1,28 @@
 import pandas as pd
+from currency_rates import CurrencyRates
 
 
 class ConvertVacancy:
     ''' Класс ConvertVacancy превращает несколько полей о зарплате в одно и формирует csv-файл
     Attributes:
-        file_name (DataFrame): исходный файл с вакансиями
+        file_name (DataFrame): исходный файл с вакансиями (None в потоковом режиме)
+        source (str): путь к исходному файлу с вакансиями
+        chunk_size (int): размер части для потоковой конвертации
         convert_file (DataFrame): файл с валютами с 2003 до 2022
+        rates (CurrencyRates): курсы валют в виде матрицы (месяц x валюта)
     '''
-    def __init__(self, file_name, convert_file):
+    def __init__(self, file_name, convert_file, chunk_size=None):
         '''
         Инициализирует класс ConvertVacancy
         :param file_name:  исходный файл с вакансиями
         :param convert_file: файл с валютами с 2003 до 2022
+        :param chunk_size: размер части для потоковой конвертации, None - файл читается целиком
         '''
-        self.file_name = pd.read_csv(file_name)
+        self.source = file_name
+        self.chunk_size = chunk_size
+        self.file_name = pd.read_csv(file_name) if chunk_size is None else None
         self.convert_file = pd.read_csv(convert_file)
+        self.rates = CurrencyRates(self.convert_file)
 
     def get_converted_currency_salary(self, currency, date):
         '''
@@ -23,14 +31,7 @@ class ConvertVacancy:
         :param date: дата в формате год-месяц
         :return: курс валюты или None если отсутствуют данные
         '''
-        try:
-            res_conv = self.convert_file[self.convert_file['date'] == date][currency].values
-        except:
-            return None
-        if len(res_conv) > 0:
-            return res_conv[0]
-        else:
-            return None
+        return self.rates.get_rate(currency, date)
 
     def get_salary_row(self, row):
         '''
@@ -59,17 +60,22 @@ class ConvertVacancy:
         salary = round(average_salary * conv, 0)
         return salary
 
-    def make_csv_100(self):
+    def make_csv_100(self, out_file='con_vac.csv'):
         '''
         создает csv-файл
+        :param out_file: название csv-файла
         :return: csv-файл
         '''
+        if self.chunk_size is not None:
+            self.rates.convert_csv(self.source, out_file, self.chunk_size)
+            return
         data = self.file_name.copy()
-        data['salary'] = data.apply(lambda x: self.get_salary_row(x), axis=1)
-        data[['name', 'salary', 'area_name', 'published_at']].to_csv('con_vac.csv', index=False)
+        data['salary'] = self.rates.get_salaries(data)
+        data[['name', 'salary', 'area_name', 'published_at']].to_csv(out_file, index=False)
 
 
-file_name = 'vacancies_dif_currencies.csv'
-convert_file = 'currency_from_2003_to_2022.csv'
-result = ConvertVacancy(file_name, convert_file)
-result.make_csv_100()
+if __name__ == '__main__':
+    file_name = 'vacancies_dif_currencies.csv'
+    convert_file = 'currency_from_2003_to_2022.csv'
+    result = ConvertVacancy(file_name, convert_file, chunk_size=100000)
+    result.make_csv_100()
@@ -1,6 +1,11 @@
+import os
 import pandas as pd
-from jinja2 import Environment, FileSystemLoader
-import pdfkit
+from dates import get_years
+import instrumentation
+from pdf_backends import get_backend
+from report_service import get_out_file
+from vacancy_cache import VacancyCache
+from vacancy_db import VacancyDatabase
 
 
 class Report:
@@ -8,58 +13,130 @@ class Report:
     Attributes:
         file_name (DataFrame) : данные о вакансиях
         profession (str) : название выбранной профессии
+        database (VacancyDatabase) : бд с вакансиями, если задана - статистика берется из нее
+        name_index (NameIndex) : индекс по названиям вакансий
+        profession_mask (np.ndarray) : строки, в названии которых есть профессия (по индексу названий)
+        cache (VacancyCache) : двоичный кэш разобранных csv, None - файл читается pandas без кэша
     '''
-    def __init__(self, file_name, profession):
+    def __init__(self, file_name, profession, database=None, cache=None):
         '''
         Инициализирует класс Report
-        :param file_name(DataFrame) : данные о вакансиях
+        :param file_name(DataFrame) : данные о вакансиях (не читаются, если задана database)
+        :param profession(str) : название выбранной профессии
+        :param database(VacancyDatabase) : бд с вакансиями
+        :param cache(VacancyCache) : кэш с вакансиями и индексом названий, None - без кэша
+        '''
+        self.database = database
+        self.cache = cache
+        self.file, self.name_index = None, None
+        if database is None and cache is not None:
+            self.file = cache.load(file_name)
+            self.name_index = cache.get_name_index(file_name)
+        elif database is None:
+            self.file = pd.read_csv(file_name, encoding='utf-8-sig', keep_default_na=False, na_values=[''],
+                                    on_bad_lines='skip')
+        self.set_profession(profession)
+
+    def set_profession(self, profession):
+        '''
+        Выбирает профессию для отчета, данные о вакансиях повторно не читаются
         :param profession(str) : название выбранной профессии
         '''
-        self.file = pd.read_csv(file_name)
         self.profession = profession
+        self.profession_mask = None
+        if self.name_index is not None:
+            self.profession_mask = self.name_index.get_mask(profession, case=False)
+        elif self.file is not None:
+            self.profession_mask = self.file['name'].str.lower().str.contains(profession.lower(), regex=False,
+                                                                              na=False).to_numpy(dtype=bool)
 
     def get_analitic_by_year(self, data: pd.DataFrame):
         '''
-        Возвращает данные о вакансиях за 1 год
+        Возвращает данные о вакансиях за 1 год (построчный вариант, get_file_analytic считает то же
+        одним groupby, analytics_benchmark.py сравнивает с ним результаты)
         :param data: вакансии
         :return: количество вакансий, средняя зарплата, количество вакансий для выбранной профессии,
          количество вакансий по выбранной профессии за год
         '''
-        prof_data = data[data['name'].str.contains(self.profession, case=False)]
+        prof_data = data[self.profession_mask[data.index]]
         average_salary = round(data.apply(lambda x: x['salary'], axis=1).mean())
         prof_average_salary = round(prof_data.apply(lambda x: x['salary'], axis=1).mean())
         return data.shape[0], average_salary, prof_data.shape[0], prof_average_salary
 
+    @instrumentation.timed()
     def get_file_analytic(self):
         '''
-        Создает словари с аналитикой по годам
+        Создает словари с аналитикой по годам: маска профессии берется из индекса названий для всего файла,
+        все четыре показателя считаются одним groupby(...).agg по зарплате и маске.
+        Год без зарплат (или без вакансий профессии) дает среднюю зарплату 0, как в VacancyDatabase
         :return: Возвращает 4 словаря
         '''
-        self.file['year'] = self.file['published_at'].apply(lambda x: x[:4])
-        years_vac = self.file.groupby(['year'])
+        if self.database is not None:
+            return self.database.get_statistics_by_year(self.profession)
+        if 'year' not in self.file:
+            self.file['year'] = get_years(self.file['published_at'])
+        instrumentation.count('rows', self.file.shape[0])
+        salary = self.file['salary']
+        mask = pd.Series(self.profession_mask, index=self.file.index)
+        analytic = pd.DataFrame({'year': self.file['year'], 'salary': salary, 'prof': mask,
+                                 'prof_salary': salary.where(mask)}).groupby('year').agg(
+            count=('salary', 'size'), average_salary=('salary', 'mean'),
+            count_prof=('prof', 'sum'), prof_average_salary=('prof_salary', 'mean')).fillna(0)
         dict_salary, dict_count, dict_salary_prof, dict_count_prof = {}, {}, {}, {}
-        for year, df in years_vac:
-            count, average_salary, count_prof, prof_average_salary = self.get_analitic_by_year(df)
-            dict_salary[year] = average_salary
-            dict_count[year] = count
-            dict_salary_prof[year] = prof_average_salary
-            dict_count_prof[year] = count_prof
+        for year, count, average_salary, count_prof, prof_average_salary in analytic.itertuples():
+            dict_salary[year] = round(average_salary)
+            dict_count[year] = int(count)
+            dict_salary_prof[year] = round(prof_average_salary)
+            dict_count_prof[year] = int(count_prof)
         return dict_salary, dict_count, dict_salary_prof, dict_count_prof
 
-    def make_pdf(self):
+    @instrumentation.timed()
+    def make_pdf(self, out_file='report.pdf', backend=None):
         '''
         Создает pdf-файл
+        :param out_file: название pdf-файла
+        :param backend: PdfBackend, по умолчанию - общий для процесса (pdf_backends.get_backend)
         :return: Возвращает pdf-файл с аналитикой по годам (с 2003 до 2022)
         '''
         salary, amount, this_vacancy_salary, this_vacancy_amount = self.get_file_analytic()
-        template = Environment(loader=FileSystemLoader('other')).get_template('pdf_template.html')
         statistic = [[year, salary[year], this_vacancy_salary[year], amount[year], this_vacancy_amount[year]] for year in salary]
-        pdf_template = template.render({'name': self.profession, 'statistic': statistic})
-        config = pdfkit.configuration(wkhtmltopdf=r'C:\Program Files\wkhtmltopdf\bin\wkhtmltopdf.exe')
-        pdfkit.from_string(pdf_template, 'report.pdf', configuration=config, options={"enable-local-file-access": ""})
+        (backend or get_backend()).write('pdf_template.html', {'name': self.profession, 'statistic': statistic},
+                                         out_file)
+
+
+def read_professions(file_name):
+    '''
+    Читает список профессий из файла (по одной в строке)
+    :param file_name: название файла
+    :return: список профессий
+    '''
+    with open(file_name, encoding='utf-8-sig') as file:
+        return [line.strip().lower() for line in file if line.strip()]
+
+
+def make_batch_pdfs(file_name, professions, directory='reports', database=None, cache=None):
+    '''
+    Создает pdf-файл для каждой профессии, файл с вакансиями читается один раз
+    :param file_name: файл с вакансиями
+    :param professions: список профессий
+    :param directory: каталог для pdf-файлов
+    :param database: бд с вакансиями
+    :param cache: кэш (VacancyCache), None - без кэша
+    '''
+    os.makedirs(directory, exist_ok=True)
+    report = Report(file_name, professions[0], database, cache)
+    for profession in professions:
+        report.set_profession(profession)
+        report.make_pdf(get_out_file(directory, profession, None))
 
 
-file_name = input('Введите название файла: ')
-profession = input('Введите название профессии: ').lower()
-result = Report(file_name, profession)
-result.make_pdf()
+if __name__ == '__main__':
+    instrumentation.enable_from_args()
+    file_name = input('Введите название файла: ')
+    profession = input('Введите название профессии или файла со списком профессий: ').lower()
+    database = VacancyDatabase(file_name) if file_name.endswith('.db') else None
+    if os.path.isfile(profession):
+        make_batch_pdfs(file_name, read_professions(profession), database=database, cache=VacancyCache())
+    else:
+        result = Report(file_name, profession, database, VacancyCache())
+        result.make_pdf()
@@ -1,6 +1,11 @@
+import os
 import pandas as pd
-from jinja2 import Environment, FileSystemLoader
-import pdfkit
+from dates import get_years
+import instrumentation
+from pdf_backends import get_backend
+from report_service import get_out_file
+from vacancy_cache import VacancyCache
+from vacancy_db import VacancyDatabase
 
 
 class Report:
@@ -9,43 +14,76 @@ class Report:
         file_name (DataFrame) : данные о вакансиях
         profession (str) : название выбранной профессии
         area(str): название города
+        database (VacancyDatabase) : бд с вакансиями, если задана - статистика берется из нее
+        name_index (NameIndex) : индекс по названиям вакансий
+        profession_mask (np.ndarray) : строки, в названии которых есть профессия (по индексу названий)
+        cache (VacancyCache) : двоичный кэш разобранных csv, None - файл читается pandas без кэша
     '''
 
-    def __init__(self, file_name, profession, area):
+    def __init__(self, file_name, profession, area, database=None, cache=None):
         '''
         Инициализирует класс Report
-        :param file_name(DataFrame) : данные о вакансиях
+        :param file_name(DataFrame) : данные о вакансиях (не читаются, если задана database)
         :param profession(str) : название выбранной профессии
         :param area(str): название города
+        :param database(VacancyDatabase) : бд с вакансиями
+        :param cache(VacancyCache) : кэш с вакансиями и индексом названий, None - без кэша
         '''
-        self.file = pd.read_csv(file_name)
-        self.profession = profession
+        self.database = database
+        self.cache = cache
+        self.file, self.name_index = None, None
+        if database is None and cache is not None:
+            self.file = cache.load(file_name)
+            self.name_index = cache.get_name_index(file_name)
+        elif database is None:
+            self.file = pd.read_csv(file_name, encoding='utf-8-sig', keep_default_na=False, na_values=[''],
+                                    on_bad_lines='skip')
+        self.set_profession(profession)
         self.area = area
 
+    def set_profession(self, profession):
+        '''
+        Выбирает профессию для отчета, данные о вакансиях повторно не читаются
+        :param profession(str) : название выбранной профессии
+        '''
+        self.profession = profession
+        self.profession_mask = None
+        if self.name_index is not None:
+            self.profession_mask = self.name_index.get_mask(profession, case=False)
+        elif self.file is not None:
+            self.profession_mask = self.file['name'].str.lower().str.contains(profession.lower(), regex=False,
+                                                                              na=False).to_numpy(dtype=bool)
+
+    @instrumentation.timed()
     def get_data_for_all_city(self):
         '''
-        проводит аналитику по всем городам
+        проводит аналитику по всем городам, город без зарплат не попадает в словарь зарплат
+        (как в VacancyDatabase.get_statistics_by_city)
         :return: 2 словаря с аналитикой по топ 10 городам
         '''
+        if self.database is not None:
+            return self.database.get_statistics_by_city()
         cities_count = self.file['area_name'].value_counts().to_dict()
         city_part = dict(filter(lambda x: x[-1] > 0.01, [(k, round(v / self.file.shape[0], 4))
                                                          for k, v in cities_count.items()]))
         dict_part_city = dict(list(city_part.items())[:10])
 
-        city_vac = self.file.groupby(['area_name'])
-        salary_by_city = {city: round(data['salary'].mean()) for city, data in city_vac if city in city_part}
+        city_salary = self.file.groupby('area_name')['salary'].mean().dropna()
+        salary_by_city = {city: round(salary) for city, salary in city_salary.items() if city in city_part}
         dict_sal_city = dict(sorted(salary_by_city.items(), key=lambda x: x[-1], reverse=True)[:10])
         return dict_sal_city, dict_part_city
 
+    @instrumentation.timed()
     def get_data_for_one(self):
         '''
         проводит аналитику для выбранного города и профессии
         :return: возвращает 2 словаря с аналитикой
         '''
-        data = self.file[
-            (self.file['name'].str.contains(self.profession, case=False)) & (self.file['area_name'] == self.area)]
-        data['year'] = data['published_at'].apply(lambda x: x[:4])
-        years_vac = data.groupby(['year'])
+        if self.database is not None:
+            return self.database.get_statistics_for_one(self.profession, self.area)
+        data = self.file[self.profession_mask & (self.file['area_name'] == self.area)]
+        data['year'] = get_years(data['published_at'])
+        years_vac = data.groupby('year')
         salary_prof = {}
         count = {}
         for year, data in years_vac:
@@ -53,24 +91,61 @@ class Report:
             count[year] = data.shape[0]
         return salary_prof, count
 
-    def make_pdf(self):
+    @instrumentation.timed()
+    def make_pdf(self, out_file='report_city.pdf', city_data=None, backend=None):
         '''
         Создает pdf-файл
+        :param out_file: название pdf-файла
+        :param city_data: готовый результат get_data_for_all_city (не зависит от профессии)
+        :param backend: PdfBackend, по умолчанию - общий для процесса (pdf_backends.get_backend)
         :return: pdf-файл с 3 таблицами
         '''
         salary_prof, count = self.get_data_for_one()
-        dict_sal_city, dict_part_city = self.get_data_for_all_city()
-        template = Environment(loader=FileSystemLoader('other')).get_template('template_upd.html')
+        dict_sal_city, dict_part_city = city_data or self.get_data_for_all_city()
         years_and_area = [[year, salary_prof[year], count[year]] for year in count]
-        pdf_template = template.render({'name': self.profession, 'area': self.area, 'years_and_area': years_and_area,
-                                        'salary_by_city': dict_sal_city.items(),
-                                        'parts_city': dict_part_city.items()})
-        config = pdfkit.configuration(wkhtmltopdf=r'C:\Program Files\wkhtmltopdf\bin\wkhtmltopdf.exe')
-        pdfkit.from_string(pdf_template, 'report_city.pdf', configuration=config, options={"enable-local-file-access": ""})
+        (backend or get_backend()).write('template_upd.html', {'name': self.profession, 'area': self.area,
+                                                               'years_and_area': years_and_area,
+                                                               'salary_by_city': dict_sal_city.items(),
+                                                               'parts_city': dict_part_city.items()}, out_file)
+
+
+def read_professions(file_name):
+    '''
+    Читает список профессий из файла (по одной в строке)
+    :param file_name: название файла
+    :return: список профессий
+    '''
+    with open(file_name, encoding='utf-8-sig') as file:
+        return [line.strip().lower() for line in file if line.strip()]
+
+
+def make_batch_pdfs(file_name, professions, area, directory='reports', database=None, cache=None):
+    '''
+    Создает pdf-файл для каждой профессии, файл с вакансиями читается один раз,
+    а аналитика по городам считается один раз для всех профессий
+    :param file_name: файл с вакансиями
+    :param professions: список профессий
+    :param area: название города
+    :param directory: каталог для pdf-файлов
+    :param database: бд с вакансиями
+    :param cache: кэш (VacancyCache), None - без кэша
+    '''
+    os.makedirs(directory, exist_ok=True)
+    report = Report(file_name, professions[0], area, database, cache)
+    city_data = report.get_data_for_all_city()
+    for profession in professions:
+        report.set_profession(profession)
+        report.make_pdf(get_out_file(directory, profession, area), city_data)
 
 
-file_name = input('Введите название файла: ')
-profession = input('Введите название профессии: ').lower()
-area = input('Введите название региона: ')
-result = Report(file_name, profession, area)
-result.make_pdf()
+if __name__ == '__main__':
+    instrumentation.enable_from_args()
+    file_name = input('Введите название файла: ')
+    profession = input('Введите название профессии или файла со списком профессий: ').lower()
+    area = input('Введите название региона: ')
+    database = VacancyDatabase(file_name) if file_name.endswith('.db') else None
+    if os.path.isfile(profession):
+        make_batch_pdfs(file_name, read_professions(profession), area, database=database, cache=VacancyCache())
+    else:
+        result = Report(file_name, profession, area, database, VacancyCache())
+        result.make_pdf()
@@ -0,0 +1,38 @@
+import importlib
+import sys
+import time
+from dates import get_years
+from vacancy_cache import VacancyCache
+
+report_by_year = importlib.import_module('342')
+
+
+def benchmark(file_name, profession):
+    '''
+    Сравнивает аналитику по годам с get_analitic_by_year для каждой группы (DataFrame.apply по строкам)
+    и одним groupby(...).agg (Report.get_file_analytic) на всем файле и проверяет, что словари совпадают
+    :param file_name: файл с вакансиями после конвертации валют
+    :param profession: профессия
+    '''
+    report = report_by_year.Report(file_name, profession, cache=VacancyCache())
+    report.file['year'] = get_years(report.file['published_at'])
+    start = time.perf_counter()
+    dicts_apply = {}, {}, {}, {}
+    for year, data in report.file.groupby('year'):
+        for result, value in zip(dicts_apply, report.get_analitic_by_year(data)):
+            result[year] = value
+    apply_time = time.perf_counter() - start
+    count, salary, count_prof, salary_prof = dicts_apply
+    dicts_apply = salary, count, salary_prof, count_prof
+    start = time.perf_counter()
+    dicts_agg = report.get_file_analytic()
+    agg_time = time.perf_counter() - start
+    print(f'Вакансий: {report.file.shape[0]}')
+    print(f'groupby + apply(axis=1): {apply_time:.3f} c')
+    print(f'groupby(...).agg: {agg_time:.3f} c (в {apply_time / agg_time:.0f} раз быстрее)')
+    print(f'Результаты совпадают: {dicts_apply == dicts_agg}')
+
+
+if __name__ == '__main__':
+    file_name = sys.argv[1] if len(sys.argv) > 1 else 'vacancies_with_converted_currency.csv'
+    benchmark(file_name, sys.argv[2] if len(sys.argv) > 2 else 'программист')
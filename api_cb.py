@@ -1,6 +1,7 @@
 import pandas as pd
 import xmltodict
 import grequests
+from dates import get_days
 
 
 class AnaliticsCurr:
@@ -60,11 +61,12 @@ class AnaliticsCurr:
 
     def get_dates(self):
         '''
-        Находит диапазон между самой старой вакансией и самой новой
+        Находит диапазон между самой старой вакансией и самой новой (дни переводятся в datetime64,
+        чтобы min и max считались numpy, а не перебором строк в Python)
         :return: диапазон между 2 датами
         '''
-        years_series = pd.to_datetime(self.data['published_at'].apply(lambda x: x[:10]))
-        dad, son = self.d_m_y_date(str(years_series.min())[:10]), self.d_m_y_date(str(years_series.max())[:10])
+        days = get_days(self.data['published_at']).astype('datetime64[D]')
+        dad, son = self.d_m_y_date(str(days.min())), self.d_m_y_date(str(days.max()))
         return pd.date_range(start=dad, end=son, freq='M').strftime('%d/%m/%Y').tolist()
 
     def requests(self):
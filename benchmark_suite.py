@@ -0,0 +1,261 @@
+import argparse
+import datetime
+import gc
+import importlib
+import json
+import multiprocessing
+import os
+import platform
+import sys
+import time
+import traceback
+import numpy as np
+import pandas as pd
+
+profession = 'Программист'
+currency_file = os.path.abspath('currency_from_2003_to_2022.csv')
+stages = ['parse', 'conversion', 'split', 'aggregation', 'excel', 'png', 'analytics', 'pdf']
+
+
+def generate_dataset(file_name, rows, seed=0, chunk_rows=1000000):
+    '''
+    Генерирует csv-файл, похожий на выгрузку hh.ru: часто повторяющиеся названия и города
+    (больше 10 городов с долей вакансий больше 1%), 10% вакансий без зарплаты, валюты из файла курсов,
+    даты с 2003 по 2022 год. Файл пишется частями, поэтому 10 млн строк не требуют много памяти,
+    и появляется под своим именем только после полной записи
+    :param file_name: название файла
+    :param rows: количество строк
+    :param seed: зерно генератора случайных чисел
+    :param chunk_rows: количество строк, генерируемых за раз
+    '''
+    rnd = np.random.default_rng(seed)
+    names = np.array([f'{name} {level}' for name in ('Программист', 'Аналитик', 'Тестировщик', 'Менеджер',
+                                                       'Java-разработчик', 'Дизайнер', 'Бухгалтер', 'Юрист')
+                      for level in ('', 'стажер', 'ведущий', 'старший', 'Senior', 'Junior')], dtype=object)
+    main_cities = ['Москва', 'Санкт-Петербург', 'Новосибирск', 'Екатеринбург', 'Казань', 'Нижний Новгород',
+                   'Краснодар', 'Самара', 'Ростов-на-Дону', 'Уфа', 'Воронеж', 'Пермь']
+    areas = np.array(main_cities + [f'Город {number}' for number in range(500)], dtype=object)
+    weights = np.concatenate([np.linspace(0.12, 0.015, len(main_cities)), np.full(500, 1.0)])
+    weights[len(main_cities):] = (1 - weights[:len(main_cities)].sum()) / 500
+    currencies = np.array(['RUR', 'USD', 'EUR', 'KZT', 'UAH', 'BYR'], dtype=object)
+    temp_name = f'{file_name}.tmp'
+    with open(temp_name, 'w', encoding='utf-8-sig', newline='') as file:
+        for start in range(0, rows, chunk_rows):
+            size = min(chunk_rows, rows - start)
+            salary_from = rnd.integers(10, 300, size) * 1000.0
+            salary_to = salary_from + rnd.integers(0, 300, size) * 1000.0
+            salary_from[rnd.random(size) < 0.1] = np.nan
+            salary_to[rnd.random(size) < 0.1] = np.nan
+            days = (np.datetime64('2003-01-01') + rnd.integers(0, 7305, size)).astype(str)
+            times = rnd.integers(0, 86400, size)
+            published_at = (pd.Series(days) + 'T' + pd.Series(times // 3600).astype(str).str.zfill(2) + ':' +
+                            pd.Series(times // 60 % 60).astype(str).str.zfill(2) + ':' +
+                            pd.Series(times % 60).astype(str).str.zfill(2) + '+0300')
+            pd.DataFrame({'name': names[rnd.integers(0, len(names), size)],
+                          'salary_from': salary_from,
+                          'salary_to': salary_to,
+                          'salary_currency': currencies[rnd.choice(len(currencies), size,
+                                                                   p=[0.9, 0.04, 0.02, 0.02, 0.01, 0.01])],
+                          'area_name': areas[rnd.choice(len(areas), size, p=weights)],
+                          'published_at': published_at}).to_csv(file, index=False, header=start == 0)
+    os.replace(temp_name, file_name)
+
+
+def prepare_stage(stage, context):
+    '''
+    Подготавливает этап (то, что не входит в измерение) и возвращает функцию, время которой измеряется
+    :param stage: название этапа
+    :param context: словарь с путями: file - набор данных, workdir - рабочий каталог
+    :return: функция без аргументов
+    '''
+    file_name, workdir = context['file'], context['workdir']
+    split_dir = os.path.join(workdir, f'split_{context["rows"]}')
+    converted_file = os.path.join(workdir, f'converted_{context["rows"]}.csv')
+    if stage == 'parse':
+        main = importlib.import_module('main')
+        return lambda: main.DataSet(file_name, profession).parse_csv()
+    if stage == 'conversion':
+        rates = importlib.import_module('currency_rates').read_rates(currency_file)
+        return lambda: rates.convert_csv(file_name, converted_file)
+    if stage == 'split':
+        csv_splitter = importlib.import_module('csv_splitter')
+        return lambda: csv_splitter.CsvSplitter(file_name, split_dir).split()
+    if stage == 'aggregation':
+        chunk_stats = importlib.import_module('chunk_stats')
+        if not os.path.isdir(split_dir):
+            importlib.import_module('csv_splitter').CsvSplitter(file_name, split_dir).split()
+        tasks = chunk_stats.get_tasks(split_dir)
+        return lambda: chunk_stats.merge_statistics(chunk_stats.get_chunk_statistics(split_dir, task, profession)
+                                                    for task in tasks).get_result()
+    if stage in ('excel', 'png'):
+        main = importlib.import_module('main')
+        report = main.Report(*main.DataSet(file_name, profession).parse_csv(), profession_name=profession)
+        if stage == 'excel':
+            return lambda: report.generate_excel(os.path.join(workdir, 'report.xlsx'))
+        renderer = importlib.import_module('chart_renderer').ChartRenderer(cache_dir=None)
+        return lambda: report.generate_image(os.path.join(workdir, 'graph.png'), renderer)
+    if stage in ('analytics', 'pdf'):
+        if not os.path.isfile(converted_file):
+            importlib.import_module('currency_rates').read_rates(currency_file).convert_csv(file_name, converted_file)
+        cache = importlib.import_module('vacancy_cache').VacancyCache(os.path.join(workdir, 'vacancy_cache'))
+        report = importlib.import_module('342').Report(converted_file, profession.lower(), cache=cache)
+        if stage == 'analytics':
+            return report.get_file_analytic
+        return lambda: report.make_pdf(os.path.join(workdir, 'report.pdf'))
+    raise ValueError(f'Неизвестный этап: {stage}')
+
+
+def get_rss():
+    '''
+    Возвращает текущий и пиковый (с последнего сброса, см. reset_peak_rss) размер резидентной памяти
+    текущего процесса из /proc/self/status
+    :return: пара мегабайт (текущий, пиковый), None - значение недоступно (не Linux)
+    '''
+    if not os.path.isfile('/proc/self/status'):
+        return None, None
+    values = {}
+    with open('/proc/self/status', encoding='ascii') as file:
+        for line in file:
+            name, _, value = line.partition(':')
+            if name in ('VmRSS', 'VmHWM'):
+                values[name] = int(value.split()[0]) / 2 ** 10
+    return values.get('VmRSS'), values.get('VmHWM')
+
+
+def reset_peak_rss():
+    '''
+    Сбрасывает пиковый размер памяти процесса (VmHWM, только Linux), чтобы пик считался
+    без памяти, занятой при подготовке этапа (ru_maxrss сбросить нельзя)
+    :return: True, если пик сброшен
+    '''
+    try:
+        with open('/proc/self/clear_refs', 'w', encoding='ascii') as file:
+            file.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def run_stage(stage, context, connection):
+    '''
+    Выполняет этап в отдельном процессе и отправляет результат измерения через connection.
+    Память этапа (stage_rss_mb) - насколько пик во время этапа превысил память после подготовки
+    (setup_rss_mb), поэтому чтение входных данных в prepare_stage не попадает в результат.
+    Если пик сбросить нельзя (не Linux), память этапа не измеряется
+    :param stage: название этапа
+    :param context: словарь с путями
+    :param connection: конец multiprocessing.Pipe
+    '''
+    try:
+        function = prepare_stage(stage, context)
+        gc.collect()
+        setup_rss, _ = get_rss()
+        reset = reset_peak_rss()
+        start = time.perf_counter()
+        function()
+        seconds = round(time.perf_counter() - start, 4)
+        _, peak = get_rss()
+        stage_rss = round(max(peak - setup_rss, 0), 1) if reset and None not in (setup_rss, peak) else None
+        result = {'seconds': seconds, 'stage_rss_mb': stage_rss,
+                  'setup_rss_mb': None if setup_rss is None else round(setup_rss, 1)}
+    except Exception as error:
+        result = {'error': f'{type(error).__name__}: {error}', 'traceback': traceback.format_exc()}
+    connection.send(result)
+    connection.close()
+
+
+def measure_stage(stage, context):
+    '''
+    Измеряет время и пиковую память этапа в новом процессе, чтобы память предыдущих этапов не учитывалась
+    :param stage: название этапа
+    :param context: словарь с путями
+    :return: словарь с seconds, stage_rss_mb и setup_rss_mb или error
+    '''
+    spawn = multiprocessing.get_context('spawn')
+    receiver, sender = spawn.Pipe(duplex=False)
+    process = spawn.Process(target=run_stage, args=(stage, context, sender))
+    process.start()
+    sender.close()
+    try:
+        result = receiver.recv()
+    except EOFError:
+        result = {'error': 'процесс этапа завершился без результата'}
+    process.join()
+    return result
+
+
+def run_suite(sizes, workdir, selected_stages=None):
+    '''
+    Генерирует наборы данных (если их еще нет) и измеряет все этапы для каждого размера
+    :param sizes: список количеств строк
+    :param workdir: каталог для наборов данных и результатов этапов
+    :param selected_stages: список этапов, по умолчанию - все
+    :return: словарь с описанием окружения и результатами (ключ - количество строк строкой, значение - этапы)
+    '''
+    workdir = os.path.abspath(workdir)
+    os.makedirs(workdir, exist_ok=True)
+    report = {'created': datetime.datetime.now().isoformat(timespec='seconds'), 'python': platform.python_version(),
+              'platform': platform.platform(), 'cpu_count': os.cpu_count(), 'results': {}}
+    for rows in sizes:
+        file_name = os.path.join(workdir, f'vacancies_{rows}.csv')
+        if not os.path.isfile(file_name):
+            generate_dataset(file_name, rows)
+        context = {'file': file_name, 'workdir': workdir, 'rows': rows}
+        report['results'][str(rows)] = {}
+        for stage in selected_stages or stages:
+            result = measure_stage(stage, context)
+            report['results'][str(rows)][stage] = result
+            print(f'{rows:>10} {stage:<12} ' + (f'{result["seconds"]:>9.3f} c {result["stage_rss_mb"] or 0:>9.1f} МБ'
+                                                 if 'error' not in result else result['error']))
+    return report
+
+
+def compare(report, baseline, tolerance=0.2):
+    '''
+    Сравнивает результаты с базовыми: этап считается замедлившимся, если время или память этапа (stage_rss_mb)
+    выросли больше чем на tolerance (доля)
+    :param report: результаты run_suite
+    :param baseline: сохраненные результаты run_suite
+    :param tolerance: допустимый рост
+    :return: список строк с описанием замедлений
+
+    >>> base = {'results': {'10000': {'parse': {'seconds': 1.0, 'stage_rss_mb': 100.0}}}}
+    >>> compare({'results': {'10000': {'parse': {'seconds': 1.5, 'stage_rss_mb': 101.0}}}}, base)
+    ['10000 parse: время 1.000 -> 1.500 c (+50%)']
+    >>> compare({'results': {'10000': {'parse': {'error': 'ValueError'}}}}, base)
+    ['10000 parse: ошибка ValueError']
+    '''
+    regressions = []
+    for rows, results in report['results'].items():
+        for stage, result in results.items():
+            base = baseline.get('results', {}).get(rows, {}).get(stage)
+            if base is None or 'error' in base:
+                continue
+            if 'error' in result:
+                regressions.append(f'{rows} {stage}: ошибка {result["error"]}')
+                continue
+            for key, name, unit in (('seconds', 'время', 'c'), ('stage_rss_mb', 'память', 'МБ')):
+                if base.get(key) and result.get(key) and result[key] > base[key] * (1 + tolerance):
+                    regressions.append(f'{rows} {stage}: {name} {base[key]:.3f} -> {result[key]:.3f} {unit} '
+                                       f'(+{result[key] / base[key] - 1:.0%})')
+    return regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Набор бенчмарков для этапов построения отчетов')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 1000000, 10000000])
+    parser.add_argument('--stages', nargs='+', choices=stages)
+    parser.add_argument('--workdir', default='benchmark_data')
+    parser.add_argument('--output', default='benchmark_results.json')
+    parser.add_argument('--baseline', help='json с базовыми результатами для сравнения')
+    parser.add_argument('--tolerance', type=float, default=0.2)
+    args = parser.parse_args()
+    suite_report = run_suite(args.sizes, args.workdir, args.stages)
+    with open(args.output, 'w', encoding='utf-8') as file:
+        json.dump(suite_report, file, ensure_ascii=False, indent=2)
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as file:
+            found = compare(suite_report, json.load(file), args.tolerance)
+        for line in found:
+            print(f'Замедление: {line}')
+        sys.exit(1 if found else 0)
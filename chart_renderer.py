@@ -0,0 +1,232 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+renderer = None
+
+
+class ChartRenderer:
+    ''' Класс ChartRenderer рисует графики отчета через объектный API matplotlib (Agg, без pyplot).
+    Фигура 2x2 создается один раз и переиспользуется: перед каждым отчетом оси очищаются,
+    а поля фигуры возвращаются к исходным (иначе tight_layout начинает с полей предыдущего отчета).
+    Готовые изображения хранятся в кэше под хэшем статистики, поэтому неизмененные графики не перерисовываются
+    Attributes:
+        cache_dir (str): каталог кэша изображений, None - без кэша
+        dpi (int): разрешение изображения
+        max_size (int): предельный размер каталога кэша в байтах, при превышении удаляются
+            давно не использованные изображения
+        figure (Figure): шаблон фигуры, None - фигура еще не создана или освобождена
+    '''
+    version = 1
+
+    def __init__(self, cache_dir='.chart_cache', dpi=100, max_size=2 ** 27):
+        '''
+        Инициализирует класс ChartRenderer
+        :param cache_dir: каталог кэша изображений, None - без кэша
+        :param dpi: разрешение изображения
+        :param max_size: предельный размер каталога кэша в байтах
+        '''
+        self.cache_dir = cache_dir
+        self.dpi = dpi
+        self.max_size = max_size
+        self.figure = None
+        self.axes = None
+        self.subplot_params = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+    def get_key(self, data):
+        '''
+        Вычисляет ключ кэша по статистике отчета
+        :param data: данные графиков (Report.get_chart_data)
+        :return: sha1 в виде строки
+
+        >>> ChartRenderer().get_key({'a': [1, 2]}) == ChartRenderer().get_key({'a': [1, 2]})
+        True
+        >>> ChartRenderer().get_key({'a': [1, 2]}) == ChartRenderer().get_key({'a': [1, 3]})
+        False
+        '''
+        content = json.dumps([self.version, self.dpi, data], ensure_ascii=False, sort_keys=True)
+        return hashlib.sha1(content.encode('utf-8')).hexdigest()
+
+    def get_cache_path(self, data):
+        '''
+        Возвращает путь к изображению в кэше
+        :param data: данные графиков
+        :return: путь или None, если кэш выключен
+        '''
+        if self.cache_dir is None:
+            return None
+        return os.path.join(self.cache_dir, f'{self.get_key(data)}.png')
+
+    def get_figure(self):
+        '''
+        Создает шаблон фигуры при первом обращении
+        :return: фигура и список из четырех осей
+        '''
+        if self.figure is None:
+            self.figure = Figure(dpi=self.dpi)
+            FigureCanvasAgg(self.figure)
+            self.axes = list(self.figure.subplots(nrows=2, ncols=2).flat)
+            self.subplot_params = {name: getattr(self.figure.subplotpars, name)
+                                   for name in ('left', 'bottom', 'right', 'top', 'wspace', 'hspace')}
+        return self.figure, self.axes
+
+    def draw(self, data):
+        '''
+        Рисует графики на шаблоне фигуры
+        :param data: данные графиков
+        '''
+        figure, (ax1, ax2, ax3, ax4) = self.get_figure()
+        for ax in self.axes:
+            ax.clear()
+        figure.subplots_adjust(**self.subplot_params)
+        profession_name = data['profession_name'].lower()
+        years = data['years']
+        index = np.arange(len(years))
+        index2 = np.arange(len(data['city_salary']))
+        cities = [city.replace(' ', '\n').replace('-', '-\n') for city, _ in data['city_salary']]
+
+        ax1.set_title('Уровень зарплат по годам', fontsize=8)
+        ax1.bar(index, data['salary'], 0.4, label='Средняя з/п')
+        ax1.bar(index + 0.4, data['salary_prof'], 0.4, label=f'з/п {profession_name}')
+        ax1.set_xticks(index + 0.2, years, rotation=90)
+        ax1.legend(loc=2)
+        ax1.xaxis.set_tick_params(labelsize=8)
+        ax1.yaxis.set_tick_params(labelsize=8)
+        ax1.yaxis.grid(True)
+
+        ax2.set_title('Количество вакансий по годам', fontsize=8)
+        ax2.bar(index, data['count'], 0.4, label='Количество вакансий')
+        ax2.bar(index + 0.4, data['count_prof'], 0.4, label=f'Количество вакансий {profession_name}')
+        ax2.set_xticks(index + 0.2, years, rotation=90)
+        ax2.legend(loc=1)
+        ax2.xaxis.set_tick_params(labelsize=8)
+        ax2.yaxis.set_tick_params(labelsize=8)
+        ax2.yaxis.grid(True)
+
+        ax3.set_title('Уровень зарплат по городам', fontsize=8)
+        ax3.barh(index2, [salary for _, salary in reversed(data['city_salary'])], 0.6)
+        ax3.set_yticks(index2, list(reversed(cities)))
+        ax3.xaxis.set_tick_params(labelsize=8)
+        ax3.yaxis.set_tick_params(labelsize=6)
+        ax3.xaxis.grid(True)
+
+        parts = data['city_parts'] + [['Другие', 1 - sum(part for _, part in data['city_parts'])]]
+        ax4.set_title('Доля вакансий по городам', fontsize=8)
+        ax4.pie([part for _, part in reversed(parts)], labels=[city for city, _ in reversed(parts)],
+                textprops={'fontsize': 6})
+        ax4.axis('equal')
+        figure.tight_layout()
+
+    def render(self, data, file_name):
+        '''
+        Сохраняет графики в файл: берет изображение из кэша или рисует его заново
+        :param data: данные графиков
+        :param file_name: имя файла с графиками
+        :return: True, если графики были нарисованы, False - если взяты из кэша
+        '''
+        cache_path = self.get_cache_path(data)
+        if cache_path is not None and os.path.isfile(cache_path):
+            os.utime(cache_path)
+            shutil.copyfile(cache_path, file_name)
+            return False
+        self.draw(data)
+        if cache_path is None:
+            self.figure.savefig(file_name)
+            return True
+        os.makedirs(self.cache_dir, exist_ok=True)
+        handle, temp_path = tempfile.mkstemp(suffix='.tmp', dir=self.cache_dir)
+        with os.fdopen(handle, 'wb') as file:
+            self.figure.savefig(file, format='png')
+        os.replace(temp_path, cache_path)
+        shutil.copyfile(cache_path, file_name)
+        self.evict(keep=cache_path)
+        return True
+
+    def evict(self, keep=None):
+        '''
+        Удаляет давно не использованные изображения, пока размер кэша больше max_size
+        :param keep: изображение, которое удалять нельзя (только что нарисованное)
+        '''
+        entries = [(entry.stat().st_mtime, entry.stat().st_size, entry.path) for entry in os.scandir(self.cache_dir)
+                   if entry.name.endswith('.png') and entry.is_file()]
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_size:
+                break
+            if path != keep:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+
+    def close(self):
+        '''Освобождает шаблон фигуры (следующий render создаст его заново)'''
+        if self.figure is not None:
+            self.figure.clear()
+        self.figure = None
+        self.axes = None
+        self.subplot_params = None
+
+
+def get_renderer(cache_dir='.chart_cache'):
+    '''
+    Возвращает общий для процесса ChartRenderer (шаблон фигуры создается один раз на процесс)
+    :param cache_dir: каталог кэша изображений
+    :return: ChartRenderer
+    '''
+    global renderer
+    if renderer is None or renderer.cache_dir != cache_dir:
+        if renderer is not None:
+            renderer.close()
+        renderer = ChartRenderer(cache_dir)
+    return renderer
+
+
+def render_job(job, cache_dir):
+    '''
+    Рисует графики одного отчета в рабочем процессе
+    :param job: данные графиков и имя файла
+    :param cache_dir: каталог кэша изображений
+    :return: True, если графики были нарисованы
+    '''
+    data, file_name = job
+    return get_renderer(cache_dir).render(data, file_name)
+
+
+def render_charts(jobs, workers=None, cache_dir='.chart_cache'):
+    '''
+    Рисует графики нескольких отчетов. Изображения из кэша копируются сразу,
+    остальные рисуются в рабочих процессах (по одному шаблону фигуры на процесс)
+    :param jobs: список пар (данные графиков, имя файла)
+    :param workers: количество процессов, по умолчанию - os.cpu_count()
+    :param cache_dir: каталог кэша изображений
+    :return: количество нарисованных отчетов
+    '''
+    parent_renderer = get_renderer(cache_dir)
+    pending = []
+    for job in jobs:
+        cache_path = parent_renderer.get_cache_path(job[0])
+        if cache_path is not None and os.path.isfile(cache_path):
+            parent_renderer.render(*job)
+        else:
+            pending.append(job)
+    workers = min(workers or os.cpu_count() or 1, len(pending))
+    if workers <= 1:
+        return sum(parent_renderer.render(*job) for job in pending)
+    with ProcessPoolExecutor(workers) as executor:
+        return sum(executor.map(partial(render_job, cache_dir=cache_dir), pending))
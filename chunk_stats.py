@@ -0,0 +1,170 @@
+import os
+import numpy as np
+from dates import get_years
+from vacancy_cache import VacancyCache
+
+max_file_columns = 32
+file_columns = {}
+
+
+class YearStatistics:
+    ''' Класс YearStatistics накапливает суммы и счетчики по годам для всех вакансий и для выбранной профессии.
+    В отличие от уже округленных средних, накопители можно складывать, поэтому файл делится на любое количество
+    частей, а итоговые средние совпадают со средними по всему файлу
+    Attributes:
+        years (dict): ключ - год, значение - список [сумма зарплат, количество зарплат, количество вакансий,
+            сумма зарплат, количество зарплат, количество вакансий для профессии]
+
+    >>> first = YearStatistics()
+    >>> first.add(np.array(['2007', '2007', '2008']), np.array([10.0, np.nan, 30.0]), np.array([True, True, False]))
+    >>> second = YearStatistics()
+    >>> second.add(np.array(['2008']), np.array([41.0]), np.array([True]))
+    >>> first.merge(second).get_result()
+    ({'2007': 10, '2008': 36}, {'2007': 2, '2008': 2}, {'2007': 10, '2008': 41}, {'2007': 2, '2008': 1})
+    '''
+    def __init__(self):
+        '''
+        Инициализирует класс YearStatistics
+        '''
+        self.years = {}
+
+    def add(self, years, salaries, profession_mask):
+        '''
+        Добавляет столбцы вакансий к накопителям
+        :param years: годы публикации
+        :param salaries: зарплаты, NaN - зарплата не указана (не учитывается в среднем, но учитывается в количестве)
+        :param profession_mask: признак того, что вакансия относится к профессии
+        '''
+        values, year_codes = np.unique(years, return_inverse=True)
+        has_salary = ~np.isnan(salaries)
+        salaries = np.where(has_salary, salaries, 0)
+        columns = []
+        for mask in (np.ones(len(salaries), dtype=bool), profession_mask):
+            columns.append(np.bincount(year_codes, weights=salaries * mask, minlength=len(values)))
+            columns.append(np.bincount(year_codes, weights=has_salary & mask, minlength=len(values)))
+            columns.append(np.bincount(year_codes, weights=mask, minlength=len(values)))
+        for code, year in enumerate(values):
+            self.add_year(str(year), [float(column[code]) for column in columns])
+
+    def add_year(self, year, sums):
+        '''
+        Добавляет суммы и счетчики одного года
+        :param year: год
+        :param sums: список в формате значения словаря years
+        '''
+        if year not in self.years:
+            self.years[year] = [0.0] * 6
+        self.years[year] = [total + value for total, value in zip(self.years[year], sums)]
+
+    def merge(self, other):
+        '''
+        Добавляет накопители другого объекта (например, посчитанного по другой части файла)
+        :param other: YearStatistics
+        :return: self
+        '''
+        for year, sums in other.years.items():
+            self.add_year(year, sums)
+        return self
+
+    def get_result(self):
+        '''
+        Формирует словари со средней зарплатой и количеством вакансий по годам, год без зарплат дает 0
+        :return: 4 словаря (ключ - год): средняя зарплата, количество вакансий,
+            средняя зарплата и количество вакансий для профессии
+        '''
+        dict_salary, dict_count, dict_salary_prof, dict_count_prof = {}, {}, {}, {}
+        for year in sorted(self.years):
+            salary, salary_count, count, salary_prof, salary_count_prof, count_prof = self.years[year]
+            dict_salary[year] = round(salary / salary_count) if salary_count else 0
+            dict_count[year] = int(count)
+            dict_salary_prof[year] = round(salary_prof / salary_count_prof) if salary_count_prof else 0
+            dict_count_prof[year] = int(count_prof)
+        return dict_salary, dict_count, dict_salary_prof, dict_count_prof
+
+
+def merge_statistics(parts):
+    '''
+    Объединяет накопители частей в один
+    :param parts: итерируемый объект с YearStatistics
+    :return: YearStatistics
+    '''
+    result = YearStatistics()
+    for part in parts:
+        result.merge(part)
+    return result
+
+
+def get_tasks(directory, chunk_rows=None, cache=None):
+    '''
+    Делит файлы каталога на части по chunk_rows строк (количество строк берется из кэша)
+    :param directory: каталог с csv-файлами
+    :param chunk_rows: количество строк в части, None - файл целиком
+    :param cache: кэш (VacancyCache)
+    :return: список кортежей (название файла, первая строка, строка после последней)
+    '''
+    cache = cache or VacancyCache()
+    tasks = []
+    for file_name in sorted(os.listdir(directory)):
+        rows = cache.get_entry(os.path.join(directory, file_name))[1]['rows']
+        step = chunk_rows or max(rows, 1)
+        tasks.extend((file_name, start, min(start + step, rows)) for start in range(0, rows, step))
+    return tasks
+
+
+def get_file_columns(path, profession, cache):
+    '''
+    Возвращает столбцы всего файла, общие для всех его частей: годы для кодов дат, коды дат, зарплаты
+    и отсортированные номера строк профессии. Словари значений и индекс названий читаются один раз
+    на процесс для каждой записи кэша, части файла затем только берут срезы
+    :param path: путь к csv-файлу
+    :param profession: название профессии
+    :param cache: кэш (VacancyCache)
+    :return: кортеж (годы по кодам дат (код -1 - пустая строка), коды дат, salary_from, salary_to, строки профессии)
+    '''
+    entry_path, _ = cache.get_entry(path)
+    key = (entry_path, profession)
+    if key not in file_columns:
+        columns = cache.load_columns(path)
+        published_codes, published = columns['published_at']
+        if len(file_columns) >= max_file_columns:
+            del file_columns[next(iter(file_columns))]
+        file_columns[key] = (get_years(published + ['']), published_codes, columns['salary_from'],
+                             columns['salary_to'], cache.get_name_index(path).find_rows(profession))
+    return file_columns[key]
+
+
+def get_columns(directory, task, profession, cache=None):
+    '''
+    Возвращает столбцы части файла, нужные для накопителей, из кэша без чтения всего файла
+    :param directory: каталог с csv-файлами
+    :param task: кортеж (название файла, первая строка, строка после последней или None - до конца файла)
+    :param profession: название профессии
+    :param cache: кэш (VacancyCache)
+    :return: годы публикации (строки), зарплаты и признак профессии, строки без даты пропускаются
+    '''
+    file_name, start, stop = task
+    year_values, published_codes, salary_from, salary_to, rows = get_file_columns(
+        os.path.join(directory, file_name), profession, cache or VacancyCache())
+    stop = len(published_codes) if stop is None else stop
+    published_codes = np.asarray(published_codes[start:stop])
+    valid = published_codes >= 0
+    years = year_values[published_codes][valid]
+    salaries = (np.asarray(salary_from[start:stop], dtype=np.float64) +
+                np.asarray(salary_to[start:stop], dtype=np.float64)) * 0.5
+    profession_mask = np.zeros(stop - start, dtype=bool)
+    profession_mask[rows[np.searchsorted(rows, start):np.searchsorted(rows, stop)] - start] = True
+    return years, salaries[valid], profession_mask[valid]
+
+
+def get_chunk_statistics(directory, task, profession, cache=None):
+    '''
+    Считает накопители по части файла
+    :param directory: каталог с csv-файлами
+    :param task: кортеж (название файла, первая строка, строка после последней или None - до конца файла)
+    :param profession: название профессии
+    :param cache: кэш (VacancyCache)
+    :return: YearStatistics
+    '''
+    statistics = YearStatistics()
+    statistics.add(*get_columns(directory, task, profession, cache))
+    return statistics
@@ -1,7 +1,8 @@
 import cProfile
 import concurrent.futures
-import pandas as pd
-import os
+from chunk_stats import get_chunk_statistics, merge_statistics
+from task_scheduler import TaskScheduler
+from vacancy_cache import VacancyCache
 
 
 class DataSet:
@@ -9,58 +10,63 @@ class DataSet:
 	Attributes:
 		directory (str): Название директории с csv-файлами (чанками)
 		profession (str): Название выбранной профессии
-		raw_data list[tuple]: Список кортежей с необработанными данными
+		chunk_rows (int): Количество строк в одной части файла, None - выбирается планировщиком по размеру файлов
+		raw_data list[YearStatistics]: Накопители сумм и счетчиков по частям файлов
+		processes (int): Наибольшее количество процессов, None - количество ядер
+		cache (VacancyCache): Кэш разобранных csv-файлов
 	"""
 
-    def __init__(self, directory, profession):
+    def __init__(self, directory, profession, chunk_rows=None, processes=None, cache=None):
         """Инициализирует объект DataSet
 		Attributes:
 			directory (str): Название директории с csv-файлами (чанками)
 			profession (str): Название выбранной профессии
+			chunk_rows (int): Количество строк в одной части файла, None - выбирается планировщиком по размеру файлов
+			processes (int): Наибольшее количество процессов, None - количество ядер
+			cache (VacancyCache): Кэш разобранных csv-файлов, по умолчанию - каталог .vacancy_cache
 		"""
         self.directory = directory
         self.profession = profession
+        self.chunk_rows = chunk_rows
+        self.processes = processes
+        self.cache = cache or VacancyCache()
         self.raw_data = []
 
     def get_analytics(self):
-        """Достает все файлы из директории, анализирует и складывает в поле raw_data"""
-        with concurrent.futures.ProcessPoolExecutor() as ex:
-            for res_chunk in ex.map(self.get_data_from_chunk, os.listdir(self.directory)):
-                self.raw_data.append(res_chunk)
+        """Достает все файлы из директории, анализирует и складывает в поле raw_data.
+		Задачи запускаются от больших к меньшим, результаты собираются по мере готовности
+		и складываются в raw_data в порядке плана, чтобы суммы не зависели от порядка завершения"""
+        scheduler = TaskScheduler(self.directory, max_workers=self.processes, chunk_rows=self.chunk_rows,
+                                  cache=self.cache)
+        tasks = scheduler.get_tasks()
+        if not tasks:
+            return
+        results = [None] * len(tasks)
+        results[-1], workers = scheduler.measure(self.get_data_from_chunk, tasks)
+        tasks = [task for task, _ in tasks[:-1]]
+        if workers == 1:
+            results[:-1] = map(self.get_data_from_chunk, tasks)
+        else:
+            with concurrent.futures.ProcessPoolExecutor(workers) as ex:
+                futures = {ex.submit(self.get_data_from_chunk, task): number for number, task in enumerate(tasks)}
+                for future in concurrent.futures.as_completed(futures):
+                    results[futures[future]] = future.result()
+        self.raw_data = results
 
-    def get_average(self, data):
-        return data.apply(lambda x: (x['salary_from'] + x['salary_to']) * 0.5, axis=1).mean()
-
-    def get_data_from_chunk(self, file_name):
-        """Возвращает параметры аналитики одного файла
+    def get_data_from_chunk(self, task):
+        """Возвращает накопители аналитики одной части файла
 		Attributes:
-			file_name (str): Название csv-файла
+			task (tuple): Название csv-файла, первая строка части и строка после последней
 		Returns:
-			year (int): Год публикации вакансии
-			average_salary (int): Средняя зарплата
-			count (int): Количество вакансий
-			average_salary_profession (int): Cредняя зарплата для выбранной профессии
-			count_profession (int): Количество вакансий для выбранной профессии
+			YearStatistics: суммы зарплат и количества вакансий по годам, всего и для выбранной профессии
 		"""
-        data = pd.read_csv(f'{self.directory}/{file_name}')
-        vac = data['name'].str.contains(self.profession)
-        vacancy_data = data[vac]
-        average_salary = round(self.get_average(data))
-        average_salary_profession = round(self.get_average(vacancy_data))
-        count = data.shape[0]
-        count_profession = vacancy_data.shape[0]
-        year = data['published_at'].apply(lambda x: x[:4]).unique()[0]
-        return year, average_salary, count, average_salary_profession, count_profession
+        return get_chunk_statistics(self.directory, task, self.profession, self.cache)
 
     def get_converted_data(self):
-        """Берет сырые данные из поля analyzed_data и разбивает их на словари, выводит их на экран
+        """Объединяет накопители из поля raw_data и разбивает их на словари, выводит их на экран
 		В словаре ключ - год, значение параметр аналитики (средняя зарплата, количество вакансий и т.д.)"""
-        dct_years_salary, dct_years_count, dct_years_salary_filt, dct_years_count_filt = {}, {}, {}, {}
-        for year, average_salary, count_by_year, average_salary_filt, count_by_year_filt in self.raw_data:
-            dct_years_salary[year] = average_salary
-            dct_years_count[year] = count_by_year
-            dct_years_salary_filt[year] = average_salary_filt
-            dct_years_count_filt[year] = count_by_year_filt
+        dct_years_salary, dct_years_count, dct_years_salary_filt, dct_years_count_filt = \
+            merge_statistics(self.raw_data).get_result()
         print(f'Динамика уровня зарплат по годам: {dct_years_salary}')
         print(f'Динамика количества вакансий по годам: {dct_years_count}')
         print(f'Динамика уровня зарплат по годам для выбранной профессии: {dct_years_salary_filt}')
@@ -0,0 +1,32 @@
+import importlib
+import sys
+import time
+import numpy as np
+
+convert_vacancy = importlib.import_module('341')
+
+
+def benchmark(file_name, convert_file):
+    '''
+    Сравнивает построчную конвертацию (DataFrame.apply с get_salary_row) и векторную (CurrencyRates.get_salaries)
+    на всем файле с вакансиями и проверяет, что результаты совпадают
+    :param file_name: исходный файл с вакансиями
+    :param convert_file: файл с валютами с 2003 до 2022
+    '''
+    result = convert_vacancy.ConvertVacancy(file_name, convert_file)
+    data = result.file_name
+    start = time.perf_counter()
+    salary_apply = data.apply(lambda x: result.get_salary_row(x), axis=1).to_numpy(dtype=np.float64)
+    apply_time = time.perf_counter() - start
+    start = time.perf_counter()
+    salary_vector = result.rates.get_salaries(data)
+    vector_time = time.perf_counter() - start
+    print(f'Вакансий: {data.shape[0]}')
+    print(f'apply(axis=1): {apply_time:.3f} c')
+    print(f'векторно: {vector_time:.3f} c (в {apply_time / vector_time:.0f} раз быстрее)')
+    print(f'Результаты совпадают: {np.array_equal(salary_apply, salary_vector, equal_nan=True)}')
+
+
+if __name__ == '__main__':
+    file_name = sys.argv[1] if len(sys.argv) > 1 else 'vacancies_dif_currencies.csv'
+    benchmark(file_name, 'currency_from_2003_to_2022.csv')
@@ -0,0 +1,52 @@
+import csv
+import io
+import os
+
+
+def get_header(file_name):
+    '''
+    Читает заголовок csv-файла
+    :param file_name: путь к csv-файлу
+    :return: список названий столбцов и смещение в байтах, с которого начинаются строки с данными
+    '''
+    with open(file_name, 'rb') as file:
+        line = file.readline()
+    return next(csv.reader([line.decode('utf-8-sig')]), []), len(line)
+
+
+def get_chunks(file_name, chunk_bytes):
+    '''
+    Делит csv-файл на диапазоны байтов примерно по chunk_bytes, каждая граница сдвигается
+    на начало следующей строки. Разбиение зависит только от файла и chunk_bytes, поэтому
+    при любом количестве процессов файл делится одинаково.
+    Поля с переводом строки внутри кавычек не поддерживаются (в выгрузках вакансий их нет)
+    :param file_name: путь к csv-файлу
+    :param chunk_bytes: примерный размер диапазона в байтах
+    :return: список названий столбцов и список пар (начало, конец) в байтах
+    '''
+    titles, start = get_header(file_name)
+    size = os.path.getsize(file_name)
+    bounds = [start]
+    with open(file_name, 'rb') as file:
+        while bounds[-1] + chunk_bytes < size:
+            file.seek(bounds[-1] + chunk_bytes)
+            file.readline()
+            if file.tell() >= size:
+                break
+            bounds.append(file.tell())
+    bounds.append(size)
+    return titles, [(bounds[i], bounds[i + 1]) for i in range(len(bounds) - 1) if bounds[i] < bounds[i + 1]]
+
+
+def read_rows(file_name, start, end):
+    '''
+    Читает строки csv-файла из диапазона байтов
+    :param file_name: путь к csv-файлу
+    :param start: начало диапазона (начало строки)
+    :param end: конец диапазона (начало следующей строки или конец файла)
+    :return: csv.reader по строкам диапазона
+    '''
+    with open(file_name, 'rb') as file:
+        file.seek(start)
+        data = file.read(end - start)
+    return csv.reader(io.StringIO(data.decode('utf-8')))
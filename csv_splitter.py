@@ -0,0 +1,138 @@
+import csv
+import os
+from collections import OrderedDict
+
+
+class CsvSplitter:
+    ''' Класс CsvSplitter потоково делит csv-файл с вакансиями на части по году, месяцу публикации
+    или по количеству строк. Файл читается построчно модулем csv, строки копятся в буферах частей
+    и дописываются в файлы пачками, одновременно открыто не больше max_open_files файлов,
+    поэтому расход памяти не зависит от размера исходного файла
+    Attributes:
+        file_name (str): исходный csv-файл
+        directory (str): каталог для частей
+        by (str): 'year', 'month' или 'rows'
+        rows_per_file (int): количество строк в части для by='rows'
+        max_open_files (int): наибольшее количество одновременно открытых файлов
+        buffer_rows (int): сколько строк части копится в памяти перед записью
+        prefix (str): начало названий файлов частей
+    '''
+    def __init__(self, file_name, directory='split_files', by='year', rows_per_file=100000, max_open_files=64,
+                 buffer_rows=1000, prefix='vacancies_by'):
+        '''
+        Инициализирует класс CsvSplitter
+        :param file_name: исходный csv-файл
+        :param directory: каталог для частей
+        :param by: 'year', 'month' или 'rows'
+        :param rows_per_file: количество строк в части для by='rows'
+        :param max_open_files: наибольшее количество одновременно открытых файлов
+        :param buffer_rows: сколько строк части копится в памяти перед записью
+        :param prefix: начало названий файлов частей
+        '''
+        if by not in ('year', 'month', 'rows'):
+            raise ValueError(f'Неизвестный способ деления: {by}')
+        self.file_name = file_name
+        self.directory = directory
+        self.by = by
+        self.rows_per_file = rows_per_file
+        self.max_open_files = max_open_files
+        self.buffer_rows = buffer_rows
+        self.prefix = prefix
+        self.header = []
+        self.files = OrderedDict()
+        self.buffers = {}
+        self.paths = {}
+
+    def get_key(self, published_at, number):
+        '''
+        Возвращает ключ части для строки
+        :param published_at: дата публикации вакансии
+        :param number: номер строки с данными (с 0)
+        :return: год, год-месяц или номер части, None - строку нельзя отнести к части
+
+        >>> CsvSplitter('a.csv').get_key('2007-12-03T17:34:36+0300', 5)
+        '2007'
+        >>> CsvSplitter('a.csv', by='month').get_key('2007-12-03T17:34:36+0300', 5)
+        '2007-12'
+        >>> CsvSplitter('a.csv', by='rows', rows_per_file=2).get_key('', 5)
+        '00002'
+        '''
+        if self.by == 'rows':
+            return f'{number // self.rows_per_file:05}'
+        width = 4 if self.by == 'year' else 7
+        return published_at[:width] if len(published_at) >= width else None
+
+    def get_file(self, key):
+        '''
+        Возвращает открытый csv.writer части, закрывая давно не использованный файл при превышении max_open_files.
+        Новая часть создается с заголовком, закрытая ранее - открывается на дозапись
+        :param key: ключ части
+        :return: csv.writer
+        '''
+        if key in self.files:
+            self.files.move_to_end(key)
+            return self.files[key][1]
+        if len(self.files) >= self.max_open_files:
+            _, (file, _) = self.files.popitem(last=False)
+            file.close()
+        if key in self.paths:
+            file = open(self.paths[key], 'a', encoding='utf-8', newline='')
+            writer = csv.writer(file)
+        else:
+            self.paths[key] = os.path.join(self.directory, f'{self.prefix}_{key}.csv')
+            file = open(self.paths[key], 'w', encoding='utf-8-sig', newline='')
+            writer = csv.writer(file)
+            writer.writerow(self.header)
+        self.files[key] = (file, writer)
+        return writer
+
+    def flush(self, key):
+        '''
+        Записывает накопленные строки части в ее файл
+        :param key: ключ части
+        '''
+        if self.buffers.get(key):
+            self.get_file(key).writerows(self.buffers[key])
+            self.buffers[key] = []
+
+    def close(self):
+        '''Записывает все буферы и закрывает файлы'''
+        for key in list(self.buffers):
+            self.flush(key)
+        for file, _ in self.files.values():
+            file.close()
+        self.files.clear()
+
+    def split(self):
+        '''
+        Делит файл на части. Строки без даты публикации или с другим количеством полей пропускаются
+        :return: словарь (ключ - ключ части, значение - путь к файлу) в порядке первого появления частей
+        '''
+        os.makedirs(self.directory, exist_ok=True)
+        self.files, self.buffers, self.paths = OrderedDict(), {}, {}
+        try:
+            with open(self.file_name, encoding='utf-8-sig', newline='') as file:
+                reader = csv.reader(file)
+                self.header = next(reader, [])
+                date_column = self.header.index('published_at') if 'published_at' in self.header else None
+                number = 0
+                for row in reader:
+                    if len(row) != len(self.header):
+                        continue
+                    key = self.get_key(row[date_column] if date_column is not None else '', number)
+                    if key is None:
+                        continue
+                    number += 1
+                    self.buffers.setdefault(key, []).append(row)
+                    if len(self.buffers[key]) >= self.buffer_rows:
+                        self.flush(key)
+        finally:
+            self.close()
+        return {key: self.paths[key] for key in self.buffers}
+
+
+if __name__ == '__main__':
+    file_name = input('Введите название файла: ')
+    by = input('Способ деления (year, month или rows): ')
+    splitter = CsvSplitter(file_name, by=by)
+    print(f'Создано файлов: {len(splitter.split())}')
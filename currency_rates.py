@@ -0,0 +1,107 @@
+import numpy as np
+import pandas as pd
+from dates import get_year_months
+
+
+class CurrencyRates:
+    ''' Класс CurrencyRates хранит курсы валют в виде плотной матрицы (месяц x валюта)
+    с целочисленными индексами месяцев и валют, поэтому курс находится без просмотра таблицы
+    Attributes:
+        months (pd.Index): месяцы в формате год-месяц, позиция в индексе - номер строки матрицы
+        currencies (pd.Index): коды валют, позиция в индексе - номер столбца матрицы
+        rates (np.ndarray): матрица курсов, 0 и NaN означают отсутствие данных
+
+    >>> rates = CurrencyRates(pd.DataFrame({'date': ['2003-01', '2003-02'], 'USD': [31.8, 0], 'EUR': [34.4, 34.0]}))
+    >>> rates.get_rate('USD', '2003-01'), rates.get_rate('USD', '2003-02'), rates.get_rate('GEL', '2003-01')
+    (31.8, None, None)
+    >>> rates.get_rates(['EUR', 'USD', 'USD', 'AZN'], ['2003-02', '2003-01', '2004-01', '2003-01'])
+    array([34. , 31.8,  nan,  nan])
+    '''
+    def __init__(self, data):
+        '''
+        Инициализирует класс CurrencyRates
+        :param data: DataFrame с курсами валют (столбец date и по столбцу на валюту)
+        '''
+        self.months = pd.Index(data['date'])
+        self.currencies = pd.Index([column for column in data.columns if column != 'date'])
+        self.rates = data[list(self.currencies)].to_numpy(dtype=np.float64)
+
+    def get_rate(self, currency, date):
+        '''
+        возвращает курс валюты
+        :param currency: код валюты ('EUR' и т.д.)
+        :param date: дата в формате год-месяц
+        :return: курс валюты или None если отсутствуют данные
+        '''
+        rate = self.get_rates([currency], [date])[0]
+        return None if np.isnan(rate) else float(rate)
+
+    def get_rates(self, currencies, dates):
+        '''
+        Возвращает курсы для целых столбцов валют и дат одной выборкой из матрицы
+        :param currencies: коды валют
+        :param dates: даты в формате год-месяц
+        :return: np.ndarray с курсами, NaN если данных нет или курс равен 0
+        '''
+        month_index = self.months.get_indexer(dates)
+        currency_index = self.currencies.get_indexer(currencies)
+        found = (month_index >= 0) & (currency_index >= 0)
+        result = np.full(len(found), np.nan)
+        result[found] = self.rates[month_index[found], currency_index[found]]
+        result[result == 0] = np.nan
+        return result
+
+    def get_salaries(self, data):
+        '''
+        Объединяет поля о зарплате в одно для всех вакансий сразу, по тем же правилам,
+        что и ConvertVacancy.get_salary_row: нет валюты или обеих границ - пусто, RUR - без конвертации,
+        нет курса - пусто, одна граница - берется большая, иначе - среднее, результат округляется
+        :param data: DataFrame с полями salary_from, salary_to, salary_currency, published_at
+        :return: np.ndarray с зарплатой в рублях, NaN если зарплату посчитать нельзя
+
+        >>> rates = CurrencyRates(pd.DataFrame({'date': ['2003-01'], 'USD': [30.0]}))
+        >>> rates.get_salaries(pd.DataFrame({'salary_from': [100, None, 10, 10, None],
+        ...                                  'salary_to': [200, 150.5, None, 20, None],
+        ...                                  'salary_currency': ['RUR', 'RUR', 'USD', 'EUR', 'RUR'],
+        ...                                  'published_at': ['2003-01-05T10:00:00+0300'] * 5}))
+        array([150., 150., 300.,  nan,  nan])
+        '''
+        salary_from = data['salary_from'].to_numpy(dtype=np.float64)
+        salary_to = data['salary_to'].to_numpy(dtype=np.float64)
+        currency = data['salary_currency']
+        is_rur = (currency == 'RUR').to_numpy(dtype=bool)
+        conv = np.ones(len(data))
+        conv[~is_rur] = self.get_rates(currency[~is_rur], get_year_months(data['published_at'][~is_rur]))
+        empty = currency.isnull().to_numpy(dtype=bool) | (np.isnan(salary_from) & np.isnan(salary_to))
+        salary_from = np.nan_to_num(salary_from, nan=0)
+        salary_to = np.nan_to_num(salary_to, nan=0)
+        average_salary = np.where((salary_to == 0) | (salary_from == 0), np.maximum(salary_to, salary_from),
+                                  0.5 * (salary_to + salary_from))
+        salary = np.round(average_salary * conv, 0)
+        salary[empty] = np.nan
+        return salary
+
+    def convert_csv(self, file_name, out_file, chunk_size=100000, nrows=None):
+        '''
+        Потоково конвертирует файл с вакансиями: читает его частями по chunk_size строк,
+        считает зарплату и дописывает часть в выходной csv, поэтому расход памяти не зависит от размера файла
+        :param file_name: исходный файл с вакансиями
+        :param out_file: csv-файл с полями name, salary, area_name, published_at
+        :param chunk_size: количество строк в одной части
+        :param nrows: сколько первых строк обработать, None - весь файл
+        '''
+        with open(out_file, 'w', encoding='utf-8', newline='') as file:
+            header = True
+            for data in pd.read_csv(file_name, chunksize=chunk_size, nrows=nrows):
+                data['salary'] = self.get_salaries(data)
+                data[['name', 'salary', 'area_name', 'published_at']].to_csv(file, index=False, header=header)
+                header = False
+
+
+def read_rates(file_name):
+    '''
+    Читает csv-файл с курсами валют
+    :param file_name: файл с валютами с 2003 до 2022
+    :return: CurrencyRates
+    '''
+    return CurrencyRates(pd.read_csv(file_name))
@@ -1,11 +1,15 @@
 import csv
+import math
 from datetime import datetime
 import datefinder
 import cProfile
+from dates import get_day_month_years
 
 data = []
 with open('vacancies_by_year.csv', encoding='utf-8-sig') as file:
     data = [row[5] for row in csv.reader(file) if 'published_at' not in row]
+rows_count = 1000000
+data = data * math.ceil(rows_count / max(len(data), 1))
 
 
 def profile(func):
@@ -20,6 +24,18 @@ def profile(func):
     return wrapper
 
 
+def profile_column(func):
+    def wrapper(data_list):
+        profile = cProfile.Profile()
+        profile.enable()
+        f = func(data_list)
+        profile.disable()
+        print(f'{func.__name__}:')
+        profile.print_stats(0)
+
+    return wrapper
+
+
 def datetime_test(date):
     date = datetime.strptime(date[:10], '%Y-%m-%d').date()
     return f'{date.day}.{date.month}.{date.year}'
@@ -46,5 +62,14 @@ def datefinder_test(date):
     return f'{date[8:10]}.{date[5:7]}.{date[:4]}'
 
 
-pr = profile(split_test)
+def numpy_slice_test(data_list):
+    return get_day_month_years(data_list)
+
+
+assert list(numpy_slice_test(data[:1000])) == [slice_test(d) for d in data[:1000]]
+print(f'Строк: {len(data)}')
+for test in (datetime_test, slice_test, split_test, datefinder_test):
+    pr = profile(test)
+    pr(data)
+pr = profile_column(numpy_slice_test)
 pr(data)
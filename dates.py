@@ -0,0 +1,80 @@
+import numpy as np
+
+
+def to_fixed_width(dates, width):
+    '''
+    Приводит столбец дат к массиву строк фиксированной ширины, лишние символы отбрасываются
+    (приведение numpy к более короткому типу U - это срез [:width] сразу для всего столбца)
+    :param dates: даты в формате 2007-12-03T17:34:36+0300 (список, np.ndarray или pd.Series без пропусков)
+    :param width: ширина строки
+    :return: np.ndarray с типом U{width}
+    '''
+    return np.asarray(dates, dtype=f'U{width}')
+
+
+def get_years(dates):
+    '''
+    Возвращает годы публикации
+    :param dates: даты публикации
+    :return: np.ndarray из строк год
+
+    >>> get_years(['2007-12-03T17:34:36+0300', '2022-07-05T18:16:15+0300'])
+    array(['2007', '2022'], dtype='<U4')
+    '''
+    return to_fixed_width(dates, 4)
+
+
+def get_year_numbers(dates):
+    '''
+    Возвращает годы публикации числами
+    :param dates: даты публикации
+    :return: np.ndarray из np.uint16
+
+    >>> get_year_numbers(['2007-12-03T17:34:36+0300'])
+    array([2007], dtype=uint16)
+    '''
+    return get_years(dates).astype(np.uint16)
+
+
+def get_year_months(dates):
+    '''
+    Возвращает год и месяц публикации
+    :param dates: даты публикации
+    :return: np.ndarray из строк год-месяц
+
+    >>> get_year_months(['2007-12-03T17:34:36+0300', '2022-07-05T18:16:15+0300'])
+    array(['2007-12', '2022-07'], dtype='<U7')
+    '''
+    return to_fixed_width(dates, 7)
+
+
+def get_days(dates):
+    '''
+    Возвращает дату публикации без времени (такие строки сортируются так же, как даты)
+    :param dates: даты публикации
+    :return: np.ndarray из строк год-месяц-день
+
+    >>> get_days(['2007-12-03T17:34:36+0300'])
+    array(['2007-12-03'], dtype='<U10')
+    '''
+    return to_fixed_width(dates, 10)
+
+
+def get_day_month_years(dates, separator='.'):
+    '''
+    Возвращает даты в формате день.месяц.год (как slice_test из date_test.py, но для всего столбца сразу):
+    строки разбиваются на символы, символы переставляются одной выборкой по столбцам
+    :param dates: даты публикации
+    :param separator: разделитель
+    :return: np.ndarray из строк день.месяц.год
+
+    >>> get_day_month_years(['2007-12-03T17:34:36+0300', '2022-07-05T18:16:15+0300'])
+    array(['03.12.2007', '05.07.2022'], dtype='<U10')
+    >>> get_day_month_years(['2007-12-03'], '/')
+    array(['03/12/2007'], dtype='<U10')
+    '''
+    chars = get_days(dates).reshape(-1)
+    chars = np.ascontiguousarray(chars).view('U1').reshape(len(chars), 10)
+    result = chars[:, [8, 9, 4, 5, 6, 7, 0, 1, 2, 3]]
+    result[:, [2, 5]] = separator
+    return result.copy().view('U10').reshape(-1)
@@ -0,0 +1,92 @@
+from itertools import chain, islice
+import openpyxl
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Border, Font, NamedStyle, Side
+from openpyxl.utils import get_column_letter
+
+
+class ExcelWriter:
+    ''' Класс ExcelWriter пишет таблицы в xlsx в потоковом режиме (openpyxl write_only):
+    строки сразу уходят во временный файл листа, поэтому память не растет с количеством строк.
+    Рамки и шрифты задаются общими именованными стилями, которые хранятся в книге один раз
+    Attributes:
+        file_name (str): название xlsx-файла
+        width_rows (int): по скольким первым строкам листа считается ширина столбцов
+        workbook (openpyxl.Workbook): книга в режиме write_only
+    '''
+    thin = Side(border_style='thin', color='000000')
+    border = Border(top=thin, left=thin, bottom=thin, right=thin)
+    style_names = {'header': 'report_header', 'cell': 'report_cell', 'right': 'report_right'}
+
+    def __init__(self, file_name, width_rows=1000):
+        '''
+        Инициализирует класс ExcelWriter
+        :param file_name: название xlsx-файла
+        :param width_rows: по скольким первым строкам листа считается ширина столбцов
+        '''
+        self.file_name = file_name
+        self.width_rows = width_rows
+        self.workbook = openpyxl.Workbook(write_only=True)
+        self.workbook.add_named_style(NamedStyle('report_header', font=Font(bold=True), border=self.border))
+        self.workbook.add_named_style(NamedStyle('report_cell', border=self.border))
+        self.workbook.add_named_style(NamedStyle('report_right', border=self.border,
+                                                 alignment=Alignment(horizontal='right')))
+
+    @staticmethod
+    def get_widths(header, rows, min_widths=None, padding=2):
+        '''
+        Считает ширину столбцов за один проход по строкам
+        :param header: заголовок
+        :param rows: строки
+        :param min_widths: наименьшая ширина каждого столбца
+        :param padding: запас к длине самого длинного значения
+        :return: список ширин
+
+        >>> ExcelWriter.get_widths(('Год', 'Зарплата'), [(2007, 100000), (2008, 1000000000)], [6, 1], padding=1)
+        [6, 11]
+        '''
+        widths = [len(str(value)) for value in header]
+        for row in rows:
+            for number, value in enumerate(row):
+                if value is not None:
+                    widths[number] = max(widths[number], len(str(value)))
+        return [max(width + padding, minimum) for width, minimum in zip(widths, min_widths or [0] * len(widths))]
+
+    def add_sheet(self, title, header, rows, column_styles=None, min_widths=None, padding=2):
+        '''
+        Добавляет лист и записывает строки. Строки могут быть итератором любой длины:
+        для ширины столбцов в памяти держатся только первые width_rows строк
+        :param title: название листа
+        :param header: заголовок
+        :param rows: строки (кортежи той же длины, что и заголовок)
+        :param column_styles: стиль каждого столбца ('cell', 'right' или None - без оформления),
+            по умолчанию - 'cell' для всех
+        :param min_widths: наименьшая ширина каждого столбца
+        :param padding: запас ширины столбца
+        '''
+        sheet = self.workbook.create_sheet(title)
+        column_styles = column_styles or ['cell'] * len(header)
+        rows = iter(rows)
+        first_rows = list(islice(rows, self.width_rows))
+        for number, width in enumerate(self.get_widths(header, first_rows, min_widths, padding), 1):
+            sheet.column_dimensions[get_column_letter(number)].width = width
+        sheet.append([self.get_cell(sheet, value, style and 'header') for value, style in zip(header, column_styles)])
+        for row in chain(first_rows, rows):
+            sheet.append([self.get_cell(sheet, value, style) for value, style in zip(row, column_styles)])
+
+    def get_cell(self, sheet, value, style):
+        '''
+        Создает ячейку для потоковой записи
+        :param sheet: лист
+        :param value: значение
+        :param style: ключ стиля из style_names или None
+        :return: WriteOnlyCell
+        '''
+        cell = WriteOnlyCell(sheet, value)
+        if style is not None:
+            cell.style = self.style_names[style]
+        return cell
+
+    def save(self):
+        '''Сохраняет книгу'''
+        self.workbook.save(self.file_name)
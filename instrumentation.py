@@ -0,0 +1,235 @@
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import nullcontext
+from functools import wraps
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+env_variable = 'VACANCY_PROFILE'
+profile = None
+disabled_stage = nullcontext()
+
+
+def get_rss():
+    '''
+    Возвращает текущий размер резидентной памяти процесса (на Linux - из /proc/self/statm,
+    иначе - пиковый размер из resource)
+    :return: мегабайты или None, если узнать размер нельзя
+    '''
+    try:
+        with open('/proc/self/statm') as file:
+            return int(file.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+    except (OSError, ValueError, AttributeError):
+        pass
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2 ** 20 if sys.platform == 'darwin' else peak / 2 ** 10
+
+
+class Stage:
+    ''' Класс Stage - запущенный этап профиля, используется как контекстный менеджер
+    Attributes:
+        profile (Profile): профиль, в который записывается этап
+        record (dict): название, родительский этап, время, количество строк и пиковая память этапа
+    '''
+    def __init__(self, profile, name):
+        '''
+        Инициализирует класс Stage
+        :param profile: профиль
+        :param name: название этапа
+        '''
+        self.profile = profile
+        self.record = {'name': name, 'parent': None, 'seconds': None, 'rows': 0, 'peak_rss_mb': None}
+        self.start = None
+
+    def __enter__(self):
+        with self.profile.lock:
+            stack = self.profile.stack
+            self.record['parent'] = stack[-1].record['name'] if stack else None
+            stack.append(self)
+        self.record['peak_rss_mb'] = get_rss()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.record['seconds'] = round(time.perf_counter() - self.start, 6)
+        if exc_type is not None:
+            self.record['error'] = f'{exc_type.__name__}: {exc_value}'
+        self.profile.sample()
+        with self.profile.lock:
+            self.profile.stack.remove(self)
+            self.profile.stages.append(self.record)
+        self.profile.emit_stage(self.record)
+        return False
+
+
+class Profile:
+    ''' Класс Profile собирает профиль одного запуска: время этапов, счетчики строк и пиковую память.
+    Память опрашивается фоновым потоком каждые interval секунд, пик относится ко всем открытым этапам
+    Attributes:
+        output (str): путь к json-файлу профиля, None - только строки журнала в stderr
+        interval (float): период опроса памяти в секундах
+        stages (list): завершенные этапы в порядке завершения
+        counters (dict): счетчики (ключ - название, значение - сумма)
+        stack (list): открытые этапы
+    '''
+    def __init__(self, output=None, interval=0.01):
+        '''
+        Инициализирует класс Profile и запускает опрос памяти
+        :param output: путь к json-файлу профиля
+        :param interval: период опроса памяти в секундах
+        '''
+        self.output = output
+        self.interval = interval
+        self.stages = []
+        self.counters = {}
+        self.stack = []
+        self.lock = threading.Lock()
+        self.pid = os.getpid()
+        self.started = time.time()
+        self.start = time.perf_counter()
+        self.peak_rss_mb = get_rss()
+        self.stopped = threading.Event()
+        self.sampler = threading.Thread(target=self.run_sampler, daemon=True)
+        self.sampler.start()
+
+    def run_sampler(self):
+        '''Опрашивает память, пока профиль не остановлен'''
+        while not self.stopped.wait(self.interval):
+            self.sample()
+
+    def sample(self):
+        '''Обновляет пиковую память профиля и открытых этапов'''
+        rss = get_rss()
+        if rss is None:
+            return
+        with self.lock:
+            self.peak_rss_mb = max(self.peak_rss_mb or 0, rss)
+            for stage in self.stack:
+                stage.record['peak_rss_mb'] = max(stage.record['peak_rss_mb'] or 0, rss)
+
+    def stage(self, name):
+        '''
+        Создает этап
+        :param name: название этапа
+        :return: Stage
+        '''
+        return Stage(self, name)
+
+    def count(self, name, rows):
+        '''
+        Увеличивает счетчик и количество строк текущего этапа
+        :param name: название счетчика
+        :param rows: количество строк
+        '''
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + rows
+            if self.stack:
+                self.stack[-1].record['rows'] += rows
+
+    def emit_stage(self, record):
+        '''
+        Пишет строку журнала о завершенном этапе (если профиль не сохраняется в файл)
+        :param record: данные этапа
+        '''
+        if self.output is None:
+            print(f'profile {json.dumps(record, ensure_ascii=False)}', file=sys.stderr)
+
+    def get_result(self):
+        '''
+        Возвращает профиль запуска
+        :return: словарь с командой, временем, пиковой памятью, этапами и счетчиками
+        '''
+        return {'argv': sys.argv, 'pid': self.pid, 'started': self.started,
+                'seconds': round(time.perf_counter() - self.start, 6), 'peak_rss_mb': self.peak_rss_mb,
+                'stages': list(self.stages), 'counters': dict(self.counters)}
+
+    def close(self):
+        '''Останавливает опрос памяти и сохраняет профиль (только в процессе, который его создал)'''
+        self.stopped.set()
+        if os.getpid() != self.pid:
+            return
+        result = self.get_result()
+        if self.output is None:
+            summary = {key: result[key] for key in ('seconds', 'peak_rss_mb', 'counters')}
+            print(f'profile {json.dumps(summary, ensure_ascii=False)}', file=sys.stderr)
+            return
+        with open(self.output, 'w', encoding='utf-8') as file:
+            json.dump(result, file, ensure_ascii=False, indent=2)
+
+
+def enable(output=None, interval=0.01):
+    '''
+    Включает профилирование до конца работы процесса, профиль сохраняется при выходе
+    :param output: путь к json-файлу профиля, None - строки журнала в stderr
+    :param interval: период опроса памяти в секундах
+    :return: Profile
+    '''
+    global profile
+    if profile is None:
+        profile = Profile(output, interval)
+        atexit.register(profile.close)
+    return profile
+
+
+def enable_from_args(argv=None):
+    '''
+    Включает профилирование, если передан флаг --profile (или --profile=путь к json)
+    :param argv: аргументы командной строки, по умолчанию - sys.argv
+    '''
+    for arg in sys.argv if argv is None else argv:
+        if arg == '--profile' or arg.startswith('--profile='):
+            enable(arg.partition('=')[2] or None)
+
+
+def stage(name):
+    '''
+    Возвращает контекстный менеджер для этапа, при выключенном профилировании - общий пустой менеджер
+
+    >>> with stage('parse'):
+    ...     count('rows', 10)
+    '''
+    if profile is None:
+        return disabled_stage
+    return profile.stage(name)
+
+
+def count(name, rows):
+    '''
+    Увеличивает счетчик строк (ничего не делает при выключенном профилировании)
+    :param name: название счетчика
+    :param rows: количество строк
+    '''
+    if profile is not None:
+        profile.count(name, rows)
+
+
+def timed(name=None):
+    '''
+    Декоратор: выполняет функцию как этап профиля, при выключенном профилировании добавляет только одну проверку
+    :param name: название этапа, по умолчанию - полное имя функции
+    :return: декоратор
+    '''
+    def decorator(function):
+        stage_name = name or function.__qualname__
+
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            if profile is None:
+                return function(*args, **kwargs)
+            with profile.stage(stage_name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+if os.environ.get(env_variable):
+    enable(None if os.environ[env_variable] in ('1', 'log') else os.environ[env_variable])
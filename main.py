@@ -1,8 +1,19 @@
 import csv
 import math
-import matplotlib.pyplot as plt
+import os
+import sys
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import zip_longest
 import numpy as np
 import doctest
+from chart_renderer import get_renderer, render_charts
+from csv_chunks import get_chunks, read_rows
+from dates import get_year_numbers
+from excel_writer import ExcelWriter
+import instrumentation
+from vacancy_cache import VacancyCache
 
 class DataSet:
     ''' Класс для парсинга csv и создания словарей.
@@ -20,18 +31,30 @@ class DataSet:
     >>> DataSet('vacancies_by_year.csv', 'Тестировщик').profession_name
     'Тестировщик'
     '''
-    def __init__(self, file_name, profession_name):
+    def __init__(self, file_name, profession_name, chunk_size=100000, cache=None, workers=None, chunk_bytes=2 ** 24):
         ''' Инициализирует объект DataSet.
         Args:
             file_name (str): название файла
             profession_name (str): профессия, для которой производится выборка
+            chunk_size (int): количество строк, которые накапливаются перед обработкой средствами numpy
+            cache (VacancyCache): двоичный кэш разобранных csv, без него файл читается csv.reader
+            workers (int): количество процессов для разбора csv, по умолчанию - количество ядер
+            chunk_bytes (int): примерный размер части файла в байтах, которую разбирает один процесс
         '''
         self.file_name = file_name
         self.profession_name = profession_name
+        self.chunk_size = chunk_size
+        self.cache = cache
+        self.workers = workers or os.cpu_count()
+        self.chunk_bytes = chunk_bytes
 
-    def parse_csv(self):
+    @instrumentation.timed()
+    def parse_csv(self, min_part=0.01):
         ''' Парсит csv и создает словари для дальнейшей работы
 
+        Args:
+            min_part (float): наименьшая доля вакансий города в статистике по городам, 0 - все города
+                (например, для полного листа по городам в Report.generate_excel(top=None))
         :returns:
             dict: распределение средней зарплаты по годам
             dict: распределение кол-ва вакансий по годам
@@ -40,58 +63,328 @@ class DataSet:
             dict: распределение средней зарплаты по городам, топ 10
             dict: распределение доли вакансий по городам (в процентах), топ 10
         '''
+        statistics = self.collect_statistics([self.profession_name])
+        instrumentation.count('rows', statistics.count)
+        return statistics.get_result(min_part=min_part)
+
+    @instrumentation.timed()
+    def parse_csv_batch(self, professions, min_part=0.01):
+        ''' Считает словари сразу для нескольких профессий за один проход по файлу
+
+        Args:
+            professions (list): профессии
+            min_part (float): наименьшая доля вакансий города, 0 - все города
+        :returns:
+            dict: ключ - профессия, значение - словари и списки в том же порядке, что и у parse_csv
+        '''
+        statistics = self.collect_statistics(professions)
+        instrumentation.count('rows', statistics.count)
+        return statistics.get_results(min_part)
+
+    def collect_statistics(self, professions):
+        ''' Накапливает статистику по файлу для списка профессий.
+        Файл делится на части по границам строк, части разбираются в пуле процессов
+        и их суммы и счетчики объединяются в порядке частей в файле. Последовательный разбор
+        (один процесс или одна часть) объединяет те же части в том же порядке, поэтому результат
+        не зависит от количества процессов.
+
+        Args:
+            professions (list): профессии
+        :returns:
+            YearCityStatistics: накопленная статистика
+        '''
+        if self.cache is not None:
+            return self.collect_cached(professions)
+        titles, chunks = get_chunks(self.file_name, self.chunk_bytes)
+        statistics = YearCityStatistics(*professions)
+        collect_chunk = partial(self.collect_chunk, titles, professions)
+        if self.workers == 1 or len(chunks) < 2:
+            for chunk in chunks:
+                statistics.merge(collect_chunk(chunk))
+            return statistics
+        with ProcessPoolExecutor(min(self.workers, len(chunks))) as executor:
+            for part in executor.map(collect_chunk, chunks):
+                statistics.merge(part)
+        return statistics
+
+    def collect_chunk(self, titles, professions, chunk):
+        ''' Накапливает статистику по части файла (выполняется в процессе пула)
+
+        Args:
+            titles (list): названия столбцов
+            professions (list): профессии
+            chunk (tuple): начало и конец части в байтах
+        :returns:
+            YearCityStatistics: статистика по части файла
+        '''
+        statistics = YearCityStatistics(*professions)
+        table = VacancyTable()
+        for row in read_rows(self.file_name, *chunk):
+            if len(titles) == len(row) and '' not in row:
+                table.append(dict(zip(titles, row)))
+                if len(table) == self.chunk_size:
+                    statistics.add_table(table)
+                    table = VacancyTable()
+        statistics.add_table(table)
+        return statistics
+
+    def collect_cached(self, professions):
+        ''' Накапливает ту же статистику, что и collect_statistics, по столбцам из двоичного кэша без разбора текста
+
+        Args:
+            professions (list): профессии
+        :returns:
+            YearCityStatistics: накопленная статистика
+        '''
+        columns = self.cache.load_columns(self.file_name)
+        name_codes, names = columns['name']
+        currency_codes, currencies = columns['salary_currency']
+        area_codes, areas = columns['area_name']
+        published_codes, published = columns['published_at']
+        salary_from, salary_to = columns['salary_from'], columns['salary_to']
+        name_index = self.cache.get_name_index(self.file_name)
+        is_profession = {}
+        for profession in professions:
+            is_profession[profession] = np.zeros(len(names), dtype=bool)
+            is_profession[profession][name_index.find_names(profession)] = True
+        published_years = get_year_numbers(published)
+        statistics = YearCityStatistics(*professions)
+        for start in range(0, len(name_codes), self.chunk_size):
+            chunk = slice(start, start + self.chunk_size)
+            valid = ((name_codes[chunk] >= 0) & (currency_codes[chunk] >= 0) & (area_codes[chunk] >= 0) &
+                     (published_codes[chunk] >= 0) & ~np.isnan(salary_from[chunk]) & ~np.isnan(salary_to[chunk]))
+            average = Salary.get_average_columns(np.trunc(salary_from[chunk][valid]), np.trunc(salary_to[chunk][valid]),
+                                                 currency_codes[chunk][valid], currencies)
+            chunk_names = name_codes[chunk][valid]
+            statistics.add_columns(average, published_years[published_codes[chunk][valid]],
+                                   {profession: mask[chunk_names] for profession, mask in is_profession.items()},
+                                   area_codes[chunk][valid], areas)
+        return statistics
+
+    def read_table(self):
+        ''' Читает все подходящие строки csv в колоночное хранилище
+
+        :returns:
+            VacancyTable: вакансии из файла
+        '''
+        table = VacancyTable()
         with open(self.file_name, encoding='utf-8-sig') as file:
             reader = csv.reader(file)
-            titles, data = [], []
-            isFirst = True
+            titles = next(reader, [])
             for row in reader:
-                if isFirst:
-                    titles = row
-                    isFirst = False
-                    continue
                 if len(titles) == len(row) and '' not in row:
-                    dct = dict(zip(titles, row))
-                    vacancy = Vacancy(dct)
-                    data.append(vacancy)
-            dct_years_count = {}
-            dct_years_salary = {}
-            dct_years_salary_filt = {}
-            dct_years_count_filt = {}
-            dct_salary_by_sity = {}
-            dct_count_by_sity = {}
-            for d in data:
-                dct_salary_by_sity[d.area_name] = 0
-                dct_count_by_sity[d.area_name] = 0
-                dct_years_salary[int(d.published_at[:4])] = 0
-                dct_years_count[int(d.published_at[:4])] = 0
-                dct_years_salary_filt[int(d.published_at[:4])] = 0
-                dct_years_count_filt[int(d.published_at[:4])] = 0
-            for d in data:
-                dct_count_by_sity[d.area_name] += 1
-                dct_years_count[int(d.published_at[:4])] += 1
-                dct_years_salary[int(d.published_at[:4])] += d.get_average()
-                dct_salary_by_sity[d.area_name] += d.get_average()
-                if self.profession_name in d.name:
-                    dct_years_count_filt[int(d.published_at[:4])] += 1
-                    dct_years_salary_filt[int(d.published_at[:4])] += d.get_average()
-            delete = []
-            for key in dct_count_by_sity:
-                if round(dct_count_by_sity[key] / len(data), 4) < 0.01:
-                    delete.append(key)
-            dct_part = {}
-            for i in delete:
-                del dct_salary_by_sity[i]
-            for key in dct_salary_by_sity:
-                dct_salary_by_sity[key] = math.floor(dct_salary_by_sity[key] / dct_count_by_sity[key])
-                dct_part[key] = round(dct_count_by_sity[key] / len(data), 4)
-            for i in dct_years_count.keys():
-                if dct_years_count[i] != 0:
-                    dct_years_salary[i] = math.floor(dct_years_salary[i] / dct_years_count[i])
-                if dct_years_count_filt[i] != 0:
-                    dct_years_salary_filt[i] = math.floor(dct_years_salary_filt[i] / dct_years_count_filt[i])
+                    table.append(dict(zip(titles, row)))
+        return table
+
+
+class YearCityStatistics:
+    ''' Класс для потокового накопления статистики по годам и городам.
+    Вакансии не хранятся: каждая строка сразу добавляется к суммам и счетчикам,
+    поэтому расход памяти зависит только от количества разных годов и городов.
+    Можно передать несколько профессий: общие суммы считаются один раз,
+    для каждой профессии дополнительно копятся только суммы и счетчики по годам.
+
+    Attributes:
+        profession_name (str): первая (основная) профессия
+        professions (dict): ключ - профессия, значение - пара словарей (сумма средних зарплат, количество вакансий)
+            по годам для этой профессии
+        count (int): количество учтенных вакансий
+        years_salary (dict): сумма средних зарплат по годам
+        years_count (dict): количество вакансий по годам
+        years_salary_filt (dict): сумма средних зарплат по годам для основной профессии
+        years_count_filt (dict): количество вакансий по годам для основной профессии
+        city_salary (dict): сумма средних зарплат по городам
+        city_count (dict): количество вакансий по городам
+
+    >>> statistics = YearCityStatistics('Аналитик')
+    >>> statistics.add(Vacancy({'name':'Аналитик', 'salary_from':10, 'salary_to':20, 'salary_currency':'RUR', 'area_name':'Москва', 'published_at':'2007-12-03T17:34:36+0300'}))
+    >>> statistics.add(Vacancy({'name':'Программист', 'salary_from':30, 'salary_to':40, 'salary_currency':'RUR', 'area_name':'Москва', 'published_at':'2007-12-03T17:34:36+0300'}))
+    >>> statistics.get_result()
+    ({2007: 25}, {2007: 2}, {2007: 15}, {2007: 1}, [('Москва', 25)], [('Москва', 1.0)])
+    >>> statistics = YearCityStatistics('Аналитик', 'Программист')
+    >>> statistics.add(Vacancy({'name':'Программист', 'salary_from':30, 'salary_to':40, 'salary_currency':'RUR', 'area_name':'Москва', 'published_at':'2007-12-03T17:34:36+0300'}))
+    >>> statistics.get_results()['Программист'][2:4]
+    ({2007: 35}, {2007: 1})
+    '''
+    def __init__(self, profession_name, *professions):
+        ''' Инициализирует объект YearCityStatistics.
+        Args:
+            profession_name (str): профессия, для которой производится выборка
+            professions (str): дополнительные профессии
+        '''
+        self.profession_name = profession_name
+        self.professions = {profession: ({}, {}) for profession in (profession_name,) + professions}
+        self.count = 0
+        self.years_salary = {}
+        self.years_count = {}
+        self.years_salary_filt, self.years_count_filt = self.professions[profession_name]
+        self.city_salary = {}
+        self.city_count = {}
+
+    def add_year(self, year):
+        ''' Добавляет год с нулевыми суммами и счетчиками, если его еще не было.
+        Args:
+            year (int): год
+        '''
+        if year not in self.years_count:
+            self.years_salary[year] = 0
+            self.years_count[year] = 0
+            for years_salary_filt, years_count_filt in self.professions.values():
+                years_salary_filt[year] = 0
+                years_count_filt[year] = 0
+
+    def add(self, vacancy):
+        ''' Добавляет одну вакансию к накопленной статистике.
+        Args:
+            vacancy (Vacancy): вакансия
+        '''
+        year = int(vacancy.published_at[:4])
+        average = vacancy.get_average()
+        self.add_year(year)
+        if vacancy.area_name not in self.city_count:
+            self.city_salary[vacancy.area_name] = 0
+            self.city_count[vacancy.area_name] = 0
+        self.count += 1
+        self.years_count[year] += 1
+        self.years_salary[year] += average
+        self.city_count[vacancy.area_name] += 1
+        self.city_salary[vacancy.area_name] += average
+        for profession, (years_salary_filt, years_count_filt) in self.professions.items():
+            if profession in vacancy.name:
+                years_count_filt[year] += 1
+                years_salary_filt[year] += average
+
+    def add_table(self, table):
+        ''' Добавляет к накопленной статистике все вакансии из колоночного хранилища.
+        Зарплаты конвертируются одним вызовом Salary.get_average_columns, проверка профессии
+        выполняется один раз для каждого уникального названия.
+        Args:
+            table (VacancyTable): вакансии
+        '''
+        if len(table) == 0:
+            return
+        name_codes = np.frombuffer(table.name_codes, dtype=np.uint32)
+        filts = {}
+        for profession in self.professions:
+            filts[profession] = np.array([profession in name for name in table.names], dtype=bool)[name_codes]
+        self.add_columns(table.get_average(), np.frombuffer(table.years, dtype=np.uint16), filts,
+                         np.frombuffer(table.area_codes, dtype=np.uint32), table.areas)
+
+    def add_columns(self, average, years, filts, area_codes, areas):
+        ''' Добавляет к накопленной статистике столбцы вакансий.
+        Суммы и счетчики по годам и городам считаются через np.bincount, новые года и города
+        добавляются в словари в порядке первого появления.
+        Args:
+            average (np.ndarray): средние зарплаты в рублях
+            years (np.ndarray): годы публикации
+            filts (dict): ключ - профессия, значение - признак того, что вакансия относится к профессии
+            area_codes (np.ndarray): коды мест публикации, индексы в списке areas
+            areas (list): места публикации
+        '''
+        if len(average) == 0:
+            return
+        years, first_rows, year_codes = np.unique(years, return_index=True, return_inverse=True)
+        years_count = np.bincount(year_codes, minlength=len(years))
+        years_salary = np.bincount(year_codes, weights=average, minlength=len(years))
+        filt_sums = {}
+        for profession, filt in filts.items():
+            filt_sums[profession] = (np.bincount(year_codes[filt], weights=average[filt], minlength=len(years)),
+                                     np.bincount(year_codes[filt], minlength=len(years)))
+        for code in np.argsort(first_rows):
+            year = int(years[code])
+            self.add_year(year)
+            self.years_count[year] += int(years_count[code])
+            self.years_salary[year] += float(years_salary[code])
+            for profession, (salary_filt, count_filt) in filt_sums.items():
+                years_salary_filt, years_count_filt = self.professions[profession]
+                years_count_filt[year] += int(count_filt[code])
+                years_salary_filt[year] += float(salary_filt[code])
+        area_values, first_rows, area_codes = np.unique(area_codes, return_index=True, return_inverse=True)
+        city_count = np.bincount(area_codes, minlength=len(area_values))
+        city_salary = np.bincount(area_codes, weights=average, minlength=len(area_values))
+        for code in np.argsort(first_rows):
+            city = areas[area_values[code]]
+            if city not in self.city_count:
+                self.city_salary[city] = 0
+                self.city_count[city] = 0
+            self.city_count[city] += int(city_count[code])
+            self.city_salary[city] += float(city_salary[code])
+        self.count += len(average)
+
+    def merge(self, other):
+        ''' Добавляет к накопленной статистике суммы и счетчики другого объекта
+        с теми же профессиями (например, посчитанного по другой части файла).
+        Новые года и города добавляются в порядке их появления в other.
+        Args:
+            other (YearCityStatistics): статистика для объединения
+
+        >>> first, second = YearCityStatistics('Аналитик'), YearCityStatistics('Аналитик')
+        >>> first.add(Vacancy({'name':'Аналитик', 'salary_from':10, 'salary_to':20, 'salary_currency':'RUR', 'area_name':'Москва', 'published_at':'2007-12-03T17:34:36+0300'}))
+        >>> second.add(Vacancy({'name':'Программист', 'salary_from':30, 'salary_to':40, 'salary_currency':'RUR', 'area_name':'Казань', 'published_at':'2008-12-03T17:34:36+0300'}))
+        >>> first.merge(second)
+        >>> first.get_result()
+        ({2007: 15, 2008: 35}, {2007: 1, 2008: 1}, {2007: 15, 2008: 0}, {2007: 1, 2008: 0}, [('Казань', 35), ('Москва', 15)], [('Москва', 0.5), ('Казань', 0.5)])
+        '''
+        for year, count in other.years_count.items():
+            self.add_year(year)
+            self.years_count[year] += count
+            self.years_salary[year] += other.years_salary[year]
+            for profession, (years_salary_filt, years_count_filt) in other.professions.items():
+                self_salary_filt, self_count_filt = self.professions[profession]
+                self_count_filt[year] += years_count_filt[year]
+                self_salary_filt[year] += years_salary_filt[year]
+        for city, count in other.city_count.items():
+            if city not in self.city_count:
+                self.city_salary[city] = 0
+                self.city_count[city] = 0
+            self.city_count[city] += count
+            self.city_salary[city] += other.city_salary[city]
+        self.count += other.count
+
+    def get_result(self, profession=None, min_part=0.01):
+        ''' Формирует итоговые словари из накопленных сумм и счетчиков
+
+        Args:
+            profession (str): профессия, по умолчанию - основная
+            min_part (float): города с меньшей долей вакансий не попадают в статистику по городам, 0 - все города
+        :returns:
+            dict: распределение средней зарплаты по годам
+            dict: распределение кол-ва вакансий по годам
+            dict: распределение средней зарплаты по годам для выбранной профессии
+            dict: распределение кол-ва вакансий по годам для выбранной профессии
+            list: распределение средней зарплаты по городам
+            list: распределение доли вакансий по городам (в процентах)
+        '''
+        years_salary_filt, years_count_filt = self.professions[profession or self.profession_name]
+        dct_years_salary = {}
+        dct_years_salary_filt = {}
+        for year, count in self.years_count.items():
+            dct_years_salary[year] = math.floor(self.years_salary[year] / count)
+            dct_years_salary_filt[year] = years_salary_filt[year]
+            if years_count_filt[year] != 0:
+                dct_years_salary_filt[year] = math.floor(years_salary_filt[year] / years_count_filt[year])
+        dct_salary_by_sity = {}
+        dct_part = {}
+        for city, count in self.city_count.items():
+            part = round(count / self.count, 4)
+            if part < min_part:
+                continue
+            dct_salary_by_sity[city] = math.floor(self.city_salary[city] / count)
+            dct_part[city] = part
         dct_salary_by_sity = sorted(dct_salary_by_sity.items(), key=lambda x: -x[1])
         dct_part = sorted(dct_part.items(), key=lambda x: -x[1])
-        return dct_years_salary, dct_years_count, dct_years_salary_filt, dct_years_count_filt, dct_salary_by_sity, dct_part
+        return dct_years_salary, dict(self.years_count), dct_years_salary_filt, dict(years_count_filt), \
+            dct_salary_by_sity, dct_part
+
+    def get_results(self, min_part=0.01):
+        ''' Формирует итоговые словари для каждой профессии
+
+        Args:
+            min_part (float): наименьшая доля вакансий города, 0 - все города
+        :returns:
+            dict: ключ - профессия, значение - словари и списки в том же порядке, что и у get_result
+        '''
+        return {profession: self.get_result(profession, min_part) for profession in self.professions}
 
 
 class Vacancy:
@@ -104,6 +397,8 @@ class Vacancy:
 
     >>> Vacancy({'name':'Программист', 'salary_from':10, 'salary_to':20.5, 'salary_currency':'RUR', 'area_name':'Москва', 'published_at':'2007-12-03T17:34:36+0300'}).name
     'Программист'
+    >>> hasattr(Vacancy({'name':'Программист', 'salary_from':10, 'salary_to':20.5, 'salary_currency':'RUR', 'area_name':'Москва', 'published_at':'2007-12-03T17:34:36+0300'}), '__dict__')
+    False
     >>> type(Vacancy({'name':'Программист', 'salary_from':10, 'salary_to':20.5, 'salary_currency':'RUR', 'area_name':'Москва', 'published_at':'2007-12-03T17:34:36+0300'})).__name__
     'Vacancy'
     >>> Vacancy({'name':'Программист', 'salary_from':10, 'salary_to':20.5, 'salary_currency':'RUR', 'area_name':'Москва', 'published_at':'2007-12-03T17:34:36+0300'}).area_name
@@ -111,6 +406,8 @@ class Vacancy:
     >>> Vacancy({'name':'Программист', 'salary_from':10, 'salary_to':20.5, 'salary_currency':'RUR', 'area_name':'Москва', 'published_at':'2007-12-03T17:34:36+0300'}).published_at
     '2007-12-03T17:34:36+0300'
     '''
+    __slots__ = ('name', 'salary', 'area_name', 'published_at')
+
     def __init__(self, dct):
         '''Инициализирует объект Vacancy.
             Args:
@@ -118,9 +415,28 @@ class Vacancy:
         '''
         self.name = dct['name']
         self.salary = Salary(dct['salary_from'], dct['salary_to'], dct['salary_currency'])
-        self.area_name = dct['area_name']
+        self.area_name = sys.intern(dct['area_name'])
         self.published_at = dct['published_at']
 
+    @classmethod
+    def from_table(cls, table, index):
+        '''Создает представление строки колоночного хранилища без разбора исходных строк.
+            Args:
+                table (VacancyTable): хранилище вакансий
+                index (int): номер строки в хранилище
+            :returns:
+                Vacancy: вакансия, строки которой разделяются со словарями хранилища
+        '''
+        vacancy = cls.__new__(cls)
+        vacancy.name = table.names[table.name_codes[index]]
+        vacancy.salary = Salary.__new__(Salary)
+        vacancy.salary.salary_from = table.salary_from[index]
+        vacancy.salary.salary_to = table.salary_to[index]
+        vacancy.salary.salary_currency = table.currencies[table.currency_codes[index]]
+        vacancy.area_name = table.areas[table.area_codes[index]]
+        vacancy.published_at = table.published[table.published_codes[index]]
+        return vacancy
+
     def get_average(self):
         ''' Вычисляет среднюю зарплату в рублях (конвертация с помоью словаря currency_to_rub)
         :returns:
@@ -165,6 +481,7 @@ class Salary:
         "USD": 60.66,
         "UZS": 0.0055,
     }
+    __slots__ = ('salary_from', 'salary_to', 'salary_currency')
 
     def __init__(self, salary_from, salary_to, salary_currency):
         ''' Инициализирует объект Salary.
@@ -175,7 +492,116 @@ class Salary:
         '''
         self.salary_from = int(float(salary_from))
         self.salary_to = int(float(salary_to))
-        self.salary_currency = salary_currency
+        self.salary_currency = sys.intern(salary_currency)
+
+    @classmethod
+    def get_average_columns(cls, salary_from, salary_to, currency_codes, currencies):
+        ''' Вычисляет средние зарплаты в рублях сразу для целых столбцов (векторный аналог Vacancy.get_average)
+        Args:
+            salary_from (array-like): нижние границы вилки оклада
+            salary_to (array-like): верхние границы вилки оклада
+            currency_codes (array-like): коды валют, индексы в списке currencies
+            currencies (list): валюты оклада
+        :returns:
+            np.ndarray: средние зарплаты в рублях
+
+        >>> Salary.get_average_columns([10, 10], [20, 20], [0, 1], ['RUR', 'EUR'])
+        array([ 15. , 898.5])
+        '''
+        rates = np.array([cls.currency_to_rub[currency] for currency in currencies], dtype=np.float64)
+        rate = rates[np.asarray(currency_codes, dtype=np.intp)]
+        return 0.5 * (np.asarray(salary_from, dtype=np.float64) * rate + np.asarray(salary_to, dtype=np.float64) * rate)
+
+
+class VacancyTable:
+    '''Класс для колоночного хранения вакансий.
+    Числовые поля лежат в типизированных массивах, а повторяющиеся строки (название, валюта, город,
+    дата публикации) хранятся один раз в словаре, в строках таблицы остаются только их коды.
+
+    Attributes:
+        salary_from (array): нижние границы вилки оклада
+        salary_to (array): верхние границы вилки оклада
+        years (array): годы публикации
+        name_codes (array): коды названий вакансий
+        currency_codes (array): коды валют оклада
+        area_codes (array): коды мест публикации
+        published_codes (array): коды дат публикации
+        names (list): названия вакансий, индекс в списке - код
+        currencies (list): валюты, индекс в списке - код
+        areas (list): места публикации, индекс в списке - код
+        published (list): даты публикации, индекс в списке - код
+
+    >>> table = VacancyTable()
+    >>> table.append({'name':'Программист', 'salary_from':'10.0', 'salary_to':'20', 'salary_currency':'RUR', 'area_name':'Москва', 'published_at':'2007-12-03T17:34:36+0300'})
+    >>> table.append({'name':'Аналитик', 'salary_from':'30', 'salary_to':'40', 'salary_currency':'RUR', 'area_name':'Москва', 'published_at':'2008-12-03T17:34:36+0300'})
+    >>> len(table), table.areas, list(table.area_codes), list(table.years)
+    (2, ['Москва'], [0, 0], [2007, 2008])
+    >>> table[1].name, table[1].salary.salary_to, table[1].get_average()
+    ('Аналитик', 40, 35.0)
+    '''
+    def __init__(self):
+        '''Инициализирует пустой объект VacancyTable.'''
+        self.salary_from = array('q')
+        self.salary_to = array('q')
+        self.years = array('H')
+        self.name_codes = array('I')
+        self.currency_codes = array('B')
+        self.area_codes = array('I')
+        self.published_codes = array('I')
+        self.names, self.currencies, self.areas, self.published = [], [], [], []
+        self._name_index, self._currency_index, self._area_index, self._published_index = {}, {}, {}, {}
+
+    def __len__(self):
+        return len(self.years)
+
+    def get_average(self):
+        '''Вычисляет средние зарплаты в рублях для всех строк таблицы.
+            :returns:
+                np.ndarray: средние зарплаты в рублях
+        '''
+        return Salary.get_average_columns(np.frombuffer(self.salary_from, dtype=np.int64),
+                                          np.frombuffer(self.salary_to, dtype=np.int64),
+                                          np.frombuffer(self.currency_codes, dtype=np.uint8), self.currencies)
+
+    def __getitem__(self, index):
+        '''Возвращает вакансию-представление строки таблицы.
+            Args:
+                index (int): номер строки
+            :returns:
+                Vacancy: вакансия
+        '''
+        if not -len(self) <= index < len(self):
+            raise IndexError('VacancyTable index out of range')
+        return Vacancy.from_table(self, index % len(self))
+
+    @staticmethod
+    def _get_code(values, index, value):
+        '''Возвращает код строки в словаре столбца, добавляя строку при первом появлении.
+            Args:
+                values (list): строки словаря
+                index (dict): соответствие строки и ее кода
+                value (str): строка
+            :returns:
+                int: код строки
+        '''
+        code = index.get(value)
+        if code is None:
+            code = index[value] = len(values)
+            values.append(value)
+        return code
+
+    def append(self, dct):
+        '''Добавляет вакансию в конец таблицы.
+            Args:
+                dct (dict): словарь содержащий ключи из 1 сторки файла и значения - одна конкретная вакансия
+        '''
+        self.salary_from.append(int(float(dct['salary_from'])))
+        self.salary_to.append(int(float(dct['salary_to'])))
+        self.years.append(int(dct['published_at'][:4]))
+        self.name_codes.append(self._get_code(self.names, self._name_index, dct['name']))
+        self.currency_codes.append(self._get_code(self.currencies, self._currency_index, dct['salary_currency']))
+        self.area_codes.append(self._get_code(self.areas, self._area_index, dct['area_name']))
+        self.published_codes.append(self._get_code(self.published, self._published_index, dct['published_at']))
 
 
 class Report:
@@ -187,6 +613,7 @@ class Report:
             dct_years_count_filt (dict): распределение количества вакансий по годам для выбранной профессии
             dct_salary_by_sity (dict): распределение уровня средних зарплат по городам
             dct_part (dict): доля вакансий по городам (в процентах)
+            profession_name (str): профессия, для которой построена статистика
 
     >>> Report({'2007': 10000, '2020': 50000}, {}, {}, {}, [], []).dct_years_salary['2020']
     50000
@@ -196,7 +623,7 @@ class Report:
     0.115
     '''
     def __init__(self, dct_years_salary, dct_years_count, dct_years_salary_filt, dct_years_count_filt,
-                 dct_salary_by_sity, dct_part):
+                 dct_salary_by_sity, dct_part, profession_name=''):
         '''Инициализирует объект Report.
             Args:
                 dct_years_salary (dict): распределение уровня  средних зарплат по годам
@@ -205,7 +632,9 @@ class Report:
                 dct_years_count_filt (dict): распределение количества вакансий по годам для выбранной профессии
                 dct_salary_by_sity (list): распределение уровня средних зарплат по городам
                 dct_part (list): доля вакансий по городам (в процентах)
+                profession_name (str): профессия, для которой построена статистика
         '''
+        self.profession_name = profession_name
         self.dct_years_salary = dct_years_salary
         self.dct_years_count = dct_years_count
         self.dct_years_salary_filt = dct_years_salary_filt
@@ -213,179 +642,120 @@ class Report:
         self.dct_salary_by_sity = dct_salary_by_sity
         self.dct_part = dct_part
 
-    def generate_excel(self):
-        '''Формирует отчет в виде таблицы.
+    @instrumentation.timed()
+    def generate_excel(self, file_name='rep.xlsx', top=10):
+        '''Формирует отчет в виде таблицы. Книга пишется потоково (ExcelWriter),
+        поэтому лист по городам может содержать все города, а не только первые 10: в лист попадают
+        города из статистики отчета, а DataSet.parse_csv(min_part=0) не отбрасывает города с долей меньше 1%.
 
+        Args:
+            file_name (str): имя файла отчета
+            top (int): сколько городов выводить, None - все города статистики отчета
         :returns:
             file (.xlsx): 'rep.xlsx'
         '''
-        wb = openpyxl.Workbook()
-        font = openpyxl.styles.Font(bold=True)
-        thin = openpyxl.styles.Side(border_style="thin", color="000000")
-        list1 = wb.active
-        list1.title = "Статистика по годам"
-        list2 = wb.create_sheet("Статистика по городам")
-        list1.append(('Год', 'Средняя зарплата', f'Средняя зарплата - {profession_name}', 'Количество вакансий',
-                      f'Количество вакансий - {profession_name}'))
-
-        list1.column_dimensions['A'].width = 6
-        list1.column_dimensions['B'].width = len('Средняя зарплата') + 1
-        list1.column_dimensions['C'].width = len(f'Средняя зарплата - {profession_name}') + 1
-        list1.column_dimensions['D'].width = len('Количество вакансий') + 1
-        list1.column_dimensions['E'].width = len(f'Количество вакансий - {profession_name}') + 1
-
-        list1['A1'].font = font
-        list1['B1'].font = font
-        list1['C1'].font = font
-        list1['D1'].font = font
-        list1['E1'].font = font
-
-        for year in self.dct_years_salary.keys():
-            list1.append((year, self.dct_years_salary[year], self.dct_years_salary_filt[year],
-                          self.dct_years_count[year], self.dct_years_count_filt[year]))
-
-        for i in range(1, len(self.dct_years_salary) + 2):
-            a = f'A{i}'
-            b = f'B{i}'
-            c = f'C{i}'
-            d = f'D{i}'
-            e = f'E{i}'
-            list1[a].border = openpyxl.styles.Border(top=thin, left=thin, bottom=thin, right=thin)
-            list1[b].border = openpyxl.styles.Border(top=thin, left=thin, bottom=thin, right=thin)
-            list1[c].border = openpyxl.styles.Border(top=thin, left=thin, bottom=thin, right=thin)
-            list1[d].border = openpyxl.styles.Border(top=thin, left=thin, bottom=thin, right=thin)
-            list1[e].border = openpyxl.styles.Border(top=thin, left=thin, bottom=thin, right=thin)
-
-        list2.append(('Город', 'Уровень зарплат', ' ', 'Город', 'Доля вакансий'))
-
-        list2.column_dimensions['A'].width = 1
-        list2.column_dimensions['B'].width = 17
-        list2.column_dimensions['C'].width = 2
-        list2.column_dimensions['D'].width = 1
-        list2.column_dimensions['E'].width = 15
-
-        list2['A1'].font = font
-        list2['B1'].font = font
-        list2['D1'].font = font
-        list2['E1'].font = font
-
-        i = 2
-        for city in dict(self.dct_salary_by_sity).keys():
-            if i < 12:
-                list2.append((city, dict(self.dct_salary_by_sity)[city]))
-                if len(city) > list2.column_dimensions['A'].width:
-                    list2.column_dimensions['A'].width = len(city) + 2
-            i += 1
-
-        j = 2
-        for city in dict(self.dct_part).keys():
-            if j < 12:
-                d = f'D{j}'
-                e = f'E{j}'
-                list2[d].value = city
-                list2[e].value = f'{round(dict(self.dct_part)[city]*100, 2)}%'
-                list2[e].alignment = openpyxl.styles.Alignment(horizontal='right')
-                if len(city) > list2.column_dimensions['D'].width:
-                    list2.column_dimensions['D'].width = len(city) + 2
-            j += 1
-
-        for i in range(1, 12):
-            a = f'A{i}'
-            b = f'B{i}'
-            d = f'D{i}'
-            e = f'E{i}'
-
-            list2[a].border = openpyxl.styles.Border(top=thin, left=thin, bottom=thin, right=thin)
-            list2[b].border = openpyxl.styles.Border(top=thin, left=thin, bottom=thin, right=thin)
-            list2[d].border = openpyxl.styles.Border(top=thin, left=thin, bottom=thin, right=thin)
-            list2[e].border = openpyxl.styles.Border(top=thin, left=thin, bottom=thin, right=thin)
-
-        wb.save('rep.xlsx')
-
-    def generate_image(self):
-        ''' Формирует отчет в виде графиков (изображение).
+        profession_name = self.profession_name
+        writer = ExcelWriter(file_name)
+        writer.add_sheet('Статистика по годам',
+                         ('Год', 'Средняя зарплата', f'Средняя зарплата - {profession_name}', 'Количество вакансий',
+                          f'Количество вакансий - {profession_name}'),
+                         ((year, self.dct_years_salary[year], self.dct_years_salary_filt[year],
+                           self.dct_years_count[year], self.dct_years_count_filt[year])
+                          for year in self.dct_years_salary),
+                         min_widths=[6, 0, 0, 0, 0], padding=1)
+        salary_by_city = self.dct_salary_by_sity[:top] if top is not None else self.dct_salary_by_sity
+        part = self.dct_part[:top] if top is not None else self.dct_part
+        rows = zip_longest(salary_by_city, part, fillvalue=(None, None))
+        writer.add_sheet('Статистика по городам', ('Город', 'Уровень зарплат', ' ', 'Город', 'Доля вакансий'),
+                         ((city, salary, None, part_city, None if value is None else f'{round(value * 100, 2)}%')
+                          for (city, salary), (part_city, value) in rows),
+                         column_styles=['cell', 'cell', None, 'cell', 'right'], min_widths=[1, 17, 2, 1, 15])
+        writer.save()
+
+    def get_chart_data(self, top=10):
+        ''' Собирает данные для графиков в простые списки (их можно передать в другой процесс и хэшировать)
+
+        Args:
+            top (int): сколько городов выводить
+        :returns:
+            dict: профессия, годы, зарплаты и количества по годам, зарплаты и доли первых top городов
+        '''
+        return {'profession_name': self.profession_name,
+                'years': list(self.dct_years_salary),
+                'salary': list(self.dct_years_salary.values()),
+                'salary_prof': list(self.dct_years_salary_filt.values()),
+                'count': list(self.dct_years_count.values()),
+                'count_prof': list(self.dct_years_count_filt.values()),
+                'city_salary': [list(item) for item in self.dct_salary_by_sity[:top]],
+                'city_parts': [list(item) for item in self.dct_part[:top]]}
+
+    @instrumentation.timed()
+    def generate_image(self, file_name='graph.png', renderer=None):
+        ''' Формирует отчет в виде графиков (изображение). Графики рисует ChartRenderer без pyplot,
+        неизмененная статистика берется из кэша изображений
 
+        Args:
+            file_name (str): имя файла с графиками
+            renderer (ChartRenderer): по умолчанию - общий для процесса
         :returns:
             file (.png): 'graph.png'
         '''
-        fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(nrows=2, ncols=2)
-        index = np.arange(len(self.dct_years_salary))
-        index2 = np.arange(10)
-        index_years = []
-        values_all = []
-        count_all = []
-        city_ax3 = []
-        city_salary = []
-        count_by_prof = []
-        values_by_prof = []
-        city_parts = []
-        num_parts = []
-        for key in dict(self.dct_part[:10]).keys():
-            city_parts.append(key)
-            num_parts.append(dict(self.dct_part)[key])
-        city_parts.append('Другие')
-        num_other = 1 - sum(dict(self.dct_part[:10]).values())
-        num_parts.append(num_other)
-        for key in dict(self.dct_salary_by_sity[:10]).keys():
-            city_ax3.append(key.replace(" ", "\n").replace("-", "-\n"))
-            city_salary.append(dict(self.dct_salary_by_sity)[key])
-        for value in self.dct_years_count.values():
-            count_all.append(value)
-        for value in self.dct_years_count_filt.values():
-            count_by_prof.append(value)
-        for value in self.dct_years_salary_filt.values():
-            values_by_prof.append(value)
-        for key in self.dct_years_salary.keys():
-            index_years.append(key)
-            values_all.append(self.dct_years_salary[key])
-
-        ax1.set_title('Уровень зарплат по годам', fontsize=8)
-        ax1.bar(index, values_all, 0.4, label='Средняя з/п')
-        ax1.bar(index+0.4, values_by_prof, 0.4, label=f'з/п {profession_name.lower()}')
-        ax1.set_xticks(index + 0.2, index_years, rotation=90)
-        ax1.legend(loc=2)
-        ax1.xaxis.set_tick_params(labelsize=8)
-        ax1.yaxis.set_tick_params(labelsize=8)
-        ax1.yaxis.grid(True)
-
-        ax2.set_title('Количество вакансий по годам', fontsize=8)
-        ax2.bar(index, count_all, 0.4, label='Количество вакансий')
-        ax2.bar(index + 0.4, count_by_prof, 0.4, label=f'Количество вакансий {profession_name.lower()}')
-        ax2.set_xticks(index + 0.2, index_years, rotation=90)
-        ax2.legend(loc=1)
-        ax2.xaxis.set_tick_params(labelsize=8)
-        ax2.yaxis.set_tick_params(labelsize=8)
-        ax2.yaxis.grid(True)
-
-        ax3.set_title('Уровень зарплат по городам', fontsize=8)
-        ax3.barh(index2, list(reversed(city_salary)), 0.6)
-        ax3.set_yticks(index2, list(reversed(city_ax3)))
-        ax3.xaxis.set_tick_params(labelsize=8)
-        ax3.yaxis.set_tick_params(labelsize=6)
-        ax3.xaxis.grid(True)
-
-        ax4.set_title('Доля вакансий по городам', fontsize=8)
-        ax4.pie(list(reversed(num_parts)), labels=list(reversed(city_parts)), textprops={'fontsize': 6})
-        ax4.axis('equal')
-
-        plt.tight_layout()
-        plt.savefig('graph.png')
-
-
-
-print_with_input = 'Введите данные для печати: '
-user_waiting = input('Требуемый формат вывода (Вакансии или Статистика): ')
-file_name, profession_name = input(print_with_input).split()
-dataset = DataSet(file_name, profession_name)
-dct_years_salary, dct_years_count, dct_years_salary_filt, dct_years_count_filt, dct_salary_by_sity, dct_part = dataset.parse_csv()
-
-report = Report(dct_years_salary, dct_years_count, dct_years_salary_filt, dct_years_count_filt, dct_salary_by_sity,
-                dct_part)
-
-if user_waiting.lower() == 'вакансии':
-    report.generate_image()
-elif user_waiting.lower() == 'статистика':
-    report.generate_excel()
-else:
-    print("Некорректный формат вывода")
+        (renderer or get_renderer()).render(self.get_chart_data(), file_name)
 
+
+def read_professions(file_name):
+    ''' Читает список профессий из файла (по одной в строке)
+
+    Args:
+        file_name (str): название файла
+    :returns:
+        list: профессии
+    '''
+    with open(file_name, encoding='utf-8-sig') as file:
+        return [line.strip() for line in file if line.strip()]
+
+
+def make_batch_reports(file_name, professions, directory='reports', cache=None, workers=None):
+    ''' Формирует отчеты (таблицу и графики) для каждой профессии за один проход по файлу,
+    графики рисуются параллельно в рабочих процессах
+
+    Args:
+        file_name (str): название файла с вакансиями
+        professions (list): профессии
+        directory (str): каталог для отчетов
+        cache (VacancyCache): двоичный кэш разобранных csv
+        workers (int): количество процессов для графиков, по умолчанию - os.cpu_count()
+    :returns:
+        dict: ключ - профессия, значение - словари и списки в том же порядке, что и у DataSet.parse_csv
+    '''
+    results = DataSet(file_name, professions[0], cache=cache).parse_csv_batch(professions)
+    os.makedirs(directory, exist_ok=True)
+    charts = []
+    for profession, result in results.items():
+        report = Report(*result, profession_name=profession)
+        report.generate_excel(os.path.join(directory, f'{profession}.xlsx'))
+        charts.append((report.get_chart_data(), os.path.join(directory, f'{profession}.png')))
+    render_charts(charts, workers)
+    return results
+
+
+if __name__ == '__main__':
+    instrumentation.enable_from_args()
+    print_with_input = 'Введите данные для печати: '
+    user_waiting = input('Требуемый формат вывода (Вакансии или Статистика): ')
+    file_name, profession_name = input(print_with_input).split()
+    if os.path.isfile(profession_name):
+        make_batch_reports(file_name, read_professions(profession_name), cache=VacancyCache())
+        sys.exit()
+    dataset = DataSet(file_name, profession_name, cache=VacancyCache())
+    dct_years_salary, dct_years_count, dct_years_salary_filt, dct_years_count_filt, dct_salary_by_sity, dct_part = dataset.parse_csv()
+
+    report = Report(dct_years_salary, dct_years_count, dct_years_salary_filt, dct_years_count_filt, dct_salary_by_sity,
+                    dct_part, profession_name)
+
+    if user_waiting.lower() == 'вакансии':
+        report.generate_image()
+    elif user_waiting.lower() == 'статистика':
+        report.generate_excel()
+    else:
+        print("Некорректный формат вывода")
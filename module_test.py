@@ -1,5 +1,21 @@
 from unittest import TestCase, main
-from main import DataSet, Vacancy, Salary, Report
+import importlib
+import os
+import sqlite3
+import tempfile
+import openpyxl
+import pandas as pd
+from chart_renderer import ChartRenderer
+import con_futures
+from dates import get_years
+from main import DataSet, Vacancy, Salary, Report, YearCityStatistics
+import multyproc
+from pdf_backends import get_backend
+from report_service import get_environment, warm_templates
+from sql2 import ConvertVacancy as SqlConvertVacancy
+import thread
+from vacancy_cache import VacancyCache
+from vacancy_db import VacancyDatabase
 
 
 class SalaryTests(TestCase):
@@ -27,6 +43,324 @@ class DataSetTests(TestCase):
     def test_profession_name(self):
         self.assertEqual(DataSet('vacancies_by_year.csv', 'Аналитик').profession_name, 'Аналитик')
 
+    def test_parse_csv(self):
+        with tempfile.TemporaryDirectory() as directory:
+            file_name = os.path.join(directory, 'vacancies.csv')
+            with open(file_name, 'w', encoding='utf-8-sig') as file:
+                file.write('name,salary_from,salary_to,salary_currency,area_name,published_at\n'
+                           'Аналитик,10,20,RUR,Москва,2007-12-03T17:34:36+0300\n'
+                           'Программист,,20,RUR,Москва,2007-12-03T17:34:36+0300\n'
+                           'Программист,10,20,EUR,Казань,2008-12-03T17:34:36+0300\n')
+            self.assertEqual(DataSet(file_name, 'Аналитик').parse_csv(),
+                             ({2007: 15, 2008: 898}, {2007: 1, 2008: 1}, {2007: 15, 2008: 0}, {2007: 1, 2008: 0},
+                              [('Казань', 898), ('Москва', 15)], [('Москва', 0.5), ('Казань', 0.5)]))
+
+    def test_parse_csv_batch(self):
+        with tempfile.TemporaryDirectory() as directory:
+            file_name = os.path.join(directory, 'vacancies.csv')
+            with open(file_name, 'w', encoding='utf-8-sig') as file:
+                file.write('name,salary_from,salary_to,salary_currency,area_name,published_at\n'
+                           'Аналитик,10,20,RUR,Москва,2007-12-03T17:34:36+0300\n'
+                           'Программист,30,50,RUR,Москва,2007-12-03T17:34:36+0300\n'
+                           'Программист,10,20,EUR,Казань,2008-12-03T17:34:36+0300\n')
+            professions = ['Аналитик', 'Программист', 'Тестировщик']
+            results = DataSet(file_name, 'Аналитик').parse_csv_batch(professions)
+            self.assertEqual(list(results), professions)
+            for profession in professions:
+                self.assertEqual(results[profession], DataSet(file_name, profession).parse_csv())
+
+    def test_parse_csv_chunks(self):
+        with tempfile.TemporaryDirectory() as directory:
+            file_name = os.path.join(directory, 'vacancies.csv')
+            with open(file_name, 'w', encoding='utf-8-sig') as file:
+                file.write('name,salary_from,salary_to,salary_currency,area_name,published_at\n')
+                for number in range(30):
+                    file.write(f'{"Аналитик" if number % 3 else "Программист"},{number * 7},{number * 11 + 3},'
+                               f'{"EUR" if number % 4 else "RUR"},{"Москва" if number % 5 else "Казань"},'
+                               f'{2007 + number % 3}-12-03T17:34:36+0300\n')
+            expected = DataSet(file_name, 'Аналитик').parse_csv()
+            self.assertEqual(DataSet(file_name, 'Аналитик', chunk_bytes=100, workers=1).parse_csv(), expected)
+            self.assertEqual(DataSet(file_name, 'Аналитик', chunk_bytes=100, workers=2).parse_csv(), expected)
+
+    def test_excel_all_cities(self):
+        with tempfile.TemporaryDirectory() as directory:
+            file_name = os.path.join(directory, 'vacancies.csv')
+            with open(file_name, 'w', encoding='utf-8-sig') as file:
+                file.write('name,salary_from,salary_to,salary_currency,area_name,published_at\n')
+                for number in range(150):
+                    file.write(f'Аналитик,10,20,RUR,{"Казань" if number == 0 else "Москва"},2007-12-03T17:34:36+0300\n')
+            self.assertEqual(DataSet(file_name, 'Аналитик').parse_csv()[5], [('Москва', 0.9933)])
+            result = DataSet(file_name, 'Аналитик').parse_csv(min_part=0)
+            self.assertEqual(result[5], [('Москва', 0.9933), ('Казань', 0.0067)])
+            excel_file = os.path.join(directory, 'report.xlsx')
+            Report(*result, profession_name='Аналитик').generate_excel(excel_file, top=None)
+            sheet = openpyxl.load_workbook(excel_file)['Статистика по городам']
+            self.assertEqual([row[3] for row in sheet.iter_rows(min_row=2, values_only=True)], ['Москва', 'Казань'])
+
+    def test_convert_streaming(self):
+        convert_vacancy = importlib.import_module('341').ConvertVacancy
+        with tempfile.TemporaryDirectory() as directory:
+            file_name = os.path.join(directory, 'vacancies.csv')
+            with open(file_name, 'w', encoding='utf-8') as file:
+                file.write('name,salary_from,salary_to,salary_currency,area_name,published_at\n')
+                for number in range(30):
+                    file.write(f'{"Аналитик" if number % 3 else "Программист"},{number * 7 if number % 6 else ""},'
+                               f'{number * 11 + 3},{["RUR", "EUR", "USD", "KZT", ""][number % 5]},Москва,'
+                               f'{2005 + number % 15}-0{1 + number % 9}-03T17:34:36+0300\n')
+            files = []
+            for chunk_size in (None, 7):
+                files.append(os.path.join(directory, f'converted_{chunk_size}.csv'))
+                convert_vacancy(file_name, 'currency_from_2003_to_2022.csv', chunk_size).make_csv_100(files[-1])
+            with open(files[0], encoding='utf-8') as expected, open(files[1], encoding='utf-8') as streamed:
+                self.assertEqual(streamed.read(), expected.read())
+
+    @staticmethod
+    def write_split_files(directory):
+        for year in (2007, 2008, 2009):
+            with open(os.path.join(directory, f'{year}.csv'), 'w', encoding='utf-8-sig') as file:
+                file.write('name,salary_from,salary_to,salary_currency,area_name,published_at\n')
+                for number in range(20 + year % 10):
+                    file.write(f'{"Аналитик" if number % 3 else "Программист"},{number * 7 if number % 4 else ""},'
+                               f'{number * 11 + 3},RUR,Москва,{year}-0{1 + number % 9}-03T17:34:36+0300\n')
+
+    def test_shared_memory(self):
+        with tempfile.TemporaryDirectory() as directory, tempfile.TemporaryDirectory() as cache_dir:
+            self.write_split_files(directory)
+            results = []
+            for shared in (False, True):
+                data = multyproc.DataSet(directory, 'Аналитик', chunk_rows=8, shared=shared,
+                                         cache=VacancyCache(cache_dir))
+                data.get_analytics()
+                results.append(multyproc.merge_statistics(data.raw_data).get_result())
+        self.assertEqual(results[0], results[1])
+        self.assertEqual(results[0][3], {'2007': 18, '2008': 18, '2009': 19})
+
+    def test_processes(self):
+        with tempfile.TemporaryDirectory() as directory, tempfile.TemporaryDirectory() as cache_dir:
+            self.write_split_files(directory)
+            results = []
+            for module in (multyproc, con_futures):
+                for processes in (1, 2):
+                    data = module.DataSet(directory, 'Аналитик', chunk_rows=8, processes=processes,
+                                          cache=VacancyCache(cache_dir))
+                    data.get_analytics()
+                    results.append(multyproc.merge_statistics(data.raw_data).get_result())
+        self.assertEqual(results, [results[0]] * 4)
+
+    def test_split_by_year(self):
+        with tempfile.TemporaryDirectory() as directory:
+            file_name = os.path.join(directory, 'vacancies.csv')
+            with open(file_name, 'w', encoding='utf-8-sig') as file:
+                file.write('name,salary_from,salary_to,salary_currency,area_name,published_at\n')
+                for number in range(40):
+                    file.write(f'Аналитик {number},{number},{number + 1},RUR,Москва,'
+                               f'{2003 + number * 7 % 11}-12-03T17:34:36+0300\n')
+            split_dir = os.path.join(directory, 'split')
+            files = thread.DataSet(file_name).makeResult(split_dir, max_workers=2)
+            self.assertEqual(sorted(os.listdir(split_dir)), sorted(os.path.basename(name) for name in files))
+            self.assertEqual(len(files), 11)
+            source = pd.read_csv(file_name)
+            for name in files:
+                year = os.path.basename(name)[len('vacancies_by_'):-len('.csv')]
+                expected = source[source['published_at'].str[:4] == year].reset_index(drop=True)
+                pd.testing.assert_frame_equal(pd.read_csv(name), expected)
+
+    def test_file_analytic(self):
+        with tempfile.TemporaryDirectory() as directory:
+            file_name = os.path.join(directory, 'vacancies.csv')
+            with open(file_name, 'w', encoding='utf-8') as file:
+                file.write('name,salary,area_name,published_at\n')
+                for number in range(40):
+                    file.write(f'{"Аналитик" if number % 3 else "Программист"},{number * 1000 if number % 7 else ""},'
+                               f'Москва,{2007 + number % 4}-12-03T17:34:36+0300\n')
+            report = importlib.import_module('342').Report(file_name, 'аналитик',
+                                                           cache=VacancyCache(os.path.join(directory, 'cache')))
+            report.file['year'] = get_years(report.file['published_at'])
+            expected = {}, {}, {}, {}
+            for year, data in report.file.groupby('year'):
+                for result, value in zip(expected, report.get_analitic_by_year(data)):
+                    result[year] = value
+            count, salary, count_prof, salary_prof = expected
+            self.assertEqual(report.get_file_analytic(), (salary, count, salary_prof, count_prof))
+            self.assertEqual(importlib.import_module('342').Report(file_name, 'аналитик').get_file_analytic(),
+                             (salary, count, salary_prof, count_prof))
+
+    def test_city_without_salaries(self):
+        with tempfile.TemporaryDirectory() as directory:
+            file_name = os.path.join(directory, 'vacancies.csv')
+            with open(file_name, 'w', encoding='utf-8') as file:
+                file.write('name,salary,area_name,published_at\n')
+                for number in range(40):
+                    area, salary = ('Нижний Новгород', '') if number % 5 == 0 else ('Москва', number * 1000)
+                    file.write(f'Аналитик,{salary},{area},2007-12-03T17:34:36+0300\n')
+            for cache in (None, VacancyCache(os.path.join(directory, 'cache'))):
+                report = importlib.import_module('343').Report(file_name, 'аналитик', 'Москва', cache=cache)
+                self.assertEqual(report.get_data_for_all_city(),
+                                 ({'Москва': 20000}, {'Москва': 0.8, 'Нижний Новгород': 0.2}))
+
+
+class YearCityStatisticsTests(TestCase):
+    def test_empty(self):
+        self.assertEqual(YearCityStatistics('Аналитик').get_result(), ({}, {}, {}, {}, [], []))
+
+
+class VacancyCacheTests(TestCase):
+    @staticmethod
+    def write_csv(file_name, rows):
+        with open(file_name, 'w', encoding='utf-8-sig') as file:
+            file.write('name,salary,area_name,published_at\n')
+            for number in range(rows):
+                file.write(f'Аналитик {number % 3},{number * 1000},Москва,2007-12-03T17:34:36+0300\n')
+
+    def test_hit(self):
+        with tempfile.TemporaryDirectory() as directory:
+            file_name = os.path.join(directory, 'vacancies.csv')
+            self.write_csv(file_name, 10)
+            cache = VacancyCache(os.path.join(directory, 'cache'))
+            entry_path, meta = cache.get_entry(file_name)
+            cache.store = None
+            self.assertEqual(cache.get_entry(file_name), (entry_path, meta))
+            self.assertEqual(meta['rows'], 10)
+
+    def test_invalidation(self):
+        with tempfile.TemporaryDirectory() as directory:
+            file_name = os.path.join(directory, 'vacancies.csv')
+            self.write_csv(file_name, 10)
+            cache = VacancyCache(os.path.join(directory, 'cache'))
+            old_path, _ = cache.get_entry(file_name)
+            self.write_csv(file_name, 12)
+            entry_path, meta = cache.get_entry(file_name)
+            self.assertNotEqual(entry_path, old_path)
+            self.assertEqual(meta['rows'], 12)
+            self.assertEqual([path for path, _ in cache.get_entries()], [entry_path])
+
+    def test_evict(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = VacancyCache(os.path.join(directory, 'cache'), max_size=1)
+            for name in ('a.csv', 'b.csv'):
+                self.write_csv(os.path.join(directory, name), 10)
+                entry_path, _ = cache.get_entry(os.path.join(directory, name))
+            self.assertEqual([path for path, _ in cache.get_entries()], [entry_path])
+
+    def test_store_existing(self):
+        with tempfile.TemporaryDirectory() as directory:
+            file_name = os.path.join(directory, 'vacancies.csv')
+            self.write_csv(file_name, 10)
+            cache = VacancyCache(os.path.join(directory, 'cache'))
+            entry_path, _ = cache.get_entry(file_name)
+            self.assertEqual(cache.store(file_name, cache.get_fingerprint(file_name)), entry_path)
+            self.assertEqual(os.listdir(cache.directory), [os.path.basename(entry_path)])
+
+
+class ChartRendererTests(TestCase):
+    def test_render_cache(self):
+        report = Report({2007: 100, 2008: 200}, {2007: 5, 2008: 7}, {2007: 50, 2008: 0}, {2007: 1, 2008: 0},
+                        [('Москва', 150), ('Казань', 90)], [('Москва', 0.6), ('Казань', 0.4)], 'Аналитик')
+        with tempfile.TemporaryDirectory() as directory:
+            with ChartRenderer(os.path.join(directory, 'cache')) as renderer:
+                self.assertTrue(renderer.render(report.get_chart_data(), os.path.join(directory, '1.png')))
+                self.assertFalse(renderer.render(report.get_chart_data(), os.path.join(directory, '2.png')))
+            self.assertTrue(os.path.getsize(os.path.join(directory, '2.png')) > 0)
+            self.assertIsNone(renderer.figure)
+
+    def test_evict(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache_dir = os.path.join(directory, 'cache')
+            with ChartRenderer(cache_dir, max_size=1) as renderer:
+                for number in range(3):
+                    report = Report({2007: 100 + number}, {2007: 5}, {2007: 50}, {2007: 1},
+                                    [('Москва', 150)], [('Москва', 0.6)], 'Аналитик')
+                    self.assertTrue(renderer.render(report.get_chart_data(), os.path.join(directory, f'{number}.png')))
+                    self.assertEqual(os.listdir(cache_dir), [os.path.basename(renderer.get_cache_path(
+                        report.get_chart_data()))])
+
+
+class PdfBackendTests(TestCase):
+    def test_fpdf_city_report(self):
+        context = {'name': 'аналитик', 'area': 'Москва', 'years_and_area': [[2007, 100, 5], [2008, 200, 7]],
+                   'salary_by_city': {'Москва': 150}.items(), 'parts_city': {'Москва': 0.6}.items()}
+        with tempfile.TemporaryDirectory() as directory:
+            file_name = os.path.join(directory, 'report.pdf')
+            get_backend('fpdf').write('template_upd.html', context, file_name)
+            with open(file_name, 'rb') as file:
+                self.assertEqual(file.read(5), b'%PDF-')
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            get_backend('html')
+
+
+class ReportServiceTests(TestCase):
+    def test_bytecode_cache(self):
+        with tempfile.TemporaryDirectory() as directory:
+            environment = get_environment(cache_dir=directory)
+            html = environment.get_template('pdf_template.html').render({'name': 'аналитик',
+                                                                         'statistic': [[2007, 1, 2, 3, 4]]})
+            self.assertIn('<th>2007</th>', html)
+            self.assertIs(get_environment(cache_dir=directory), environment)
+            self.assertEqual(len(os.listdir(directory)), 1)
+
+    def test_templates_only_for_pdfkit(self):
+        self.assertFalse(warm_templates())
+
+
+class SqlConvertTests(TestCase):
+    def test_bulk_salaries(self):
+        with tempfile.TemporaryDirectory() as directory:
+            file_name = os.path.join(directory, 'vacancies.csv')
+            with open(file_name, 'w', encoding='utf-8') as file:
+                file.write('name,salary_from,salary_to,salary_currency,area_name,published_at\n'
+                           'Аналитик,10000,20000,RUR,Москва,2007-01-10T10:00:00+0300\n'
+                           'Аналитик,1000,,USD,Москва,2007-01-11T10:00:00+0300\n'
+                           'Программист,,2000,EUR,Казань,2007-02-11T10:00:00+0300\n'
+                           'Программист,100,300,KZT,Казань,2007-02-12T10:00:00+0300\n'
+                           'Программист,1000,2000,USD,Казань,2008-05-12T10:00:00+0300\n'
+                           'Юрист,,,RUR,Казань,2007-01-12T10:00:00+0300\n'
+                           'Юрист,5000,6000,,Казань,2007-01-12T10:00:00+0300\n')
+            connection = sqlite3.connect(os.path.join(directory, 'currency.db'))
+            connection.execute('create table currency_values_03_22 (date text, USD real, EUR real, KZT real)')
+            connection.executemany('insert into currency_values_03_22 values (?, ?, ?, ?)',
+                                   [('2007-01', 26.5, 34.7, None), ('2007-02', 26.2, 34.1, 0.21)])
+            connection.commit()
+            converter = SqlConvertVacancy(file_name, connection)
+            expected = [converter.get_salary_row(row) for _, row in converter.file_name.iterrows()]
+            converter.make_sql_bulk(wal=True)
+            salaries = [row[0] for row in connection.execute('select salary from YagodkinaVera order by id')]
+            self.assertEqual(connection.execute('pragma journal_mode').fetchone()[0], 'delete')
+            connection.close()
+        self.assertEqual(salaries, expected)
+        self.assertEqual(expected[:4], [15000, 26500, 68200, 42])
+
+
+class VacancyDatabaseTests(TestCase):
+    def test_same_as_pandas(self):
+        rows = [('Аналитик', 100000, 'Москва', '2007-01-10T10:00:00+0300'),
+                ('Ведущий аналитик', 150000, 'Москва', '2007-03-10T10:00:00+0300'),
+                ('аналитик данных', '', 'Казань', '2007-05-10T10:00:00+0300'),
+                ('Программист', 90000, 'Москва', '2007-06-10T10:00:00+0300'),
+                ('Программист', 80000, 'Казань', '2008-01-10T10:00:00+0300'),
+                ('Юрист', 70000, 'Москва', '2008-02-10T10:00:00+0300'),
+                ('Аналитик', 120000, 'Москва', '2009-02-10T10:00:00+0300'),
+                ('Юрист', 50000, 'Пермь', '2009-04-10T10:00:00+0300'),
+                ('Аналитик', '', 'Нижний Новгород', '2009-05-10T10:00:00+0300'),
+                ('Юрист', '', 'Нижний Новгород', '2009-06-10T10:00:00+0300')]
+        with tempfile.TemporaryDirectory() as directory:
+            file_name = os.path.join(directory, 'vacancies.csv')
+            with open(file_name, 'w', encoding='utf-8') as file:
+                file.write('name,salary,area_name,published_at\n')
+                file.writelines(','.join(map(str, row)) + '\n' for row in rows)
+            database = VacancyDatabase(':memory:')
+            database.load_csv(file_name)
+            cache = VacancyCache(os.path.join(directory, 'cache'))
+            by_year = importlib.import_module('342').Report(file_name, 'аналитик', cache=cache)
+            by_city = importlib.import_module('343').Report(file_name, 'аналитик', 'Москва', cache=cache)
+            self.assertEqual(database.get_statistics_by_year('аналитик'), by_year.get_file_analytic())
+            self.assertEqual(database.get_statistics_for_one('аналитик', 'Москва'), by_city.get_data_for_one())
+            self.assertEqual(database.get_statistics_by_city(), by_city.get_data_for_all_city())
+            self.assertNotIn('Нижний Новгород', database.get_statistics_by_city()[0])
+            self.assertIn('Нижний Новгород', database.get_statistics_by_city()[1])
+        self.assertEqual(by_year.get_file_analytic()[2], {'2007': 125000, '2008': 0, '2009': 120000})
+
 
 if __name__ == '__main__':
     main()
@@ -1,7 +1,12 @@
 import cProfile
+import math
 import multiprocessing
-import pandas as pd
+from multiprocessing import shared_memory
 import os
+import numpy as np
+from chunk_stats import YearStatistics, get_chunk_statistics, get_columns, get_tasks, merge_statistics
+from task_scheduler import TaskScheduler
+from vacancy_cache import VacancyCache
 
 
 class DataSet:
@@ -9,63 +14,128 @@ class DataSet:
 	Attributes:
 		directory (str): Название директории с csv-файлами (чанками)
 		profession (str): Название выбранной профессии
-		raw_data list[tuple]: Список кортежей с необработанными данными
+		chunk_rows (int): Количество строк в одной части файла, None - выбирается планировщиком по размеру файлов
+		shared (bool): Передавать процессам столбцы через общую память вместо чтения файлов в каждом процессе
+		raw_data list[YearStatistics]: Накопители сумм и счетчиков по частям файлов
+		processes (int): Наибольшее количество процессов, None - количество ядер
+		cache (VacancyCache): Кэш разобранных csv-файлов
 	"""
 
-    def __init__(self, directory, profession):
+    def __init__(self, directory, profession, chunk_rows=None, shared=False, processes=None, cache=None):
         """Инициализирует объект DataSet
 		Attributes:
 			directory (str): Название директории с csv-файлами (чанками)
 			profession (str): Название выбранной профессии
+			chunk_rows (int): Количество строк в одной части файла, None - выбирается планировщиком по размеру файлов
+			shared (bool): Передавать процессам столбцы через общую память
+			processes (int): Наибольшее количество процессов, None - количество ядер
+			cache (VacancyCache): Кэш разобранных csv-файлов, по умолчанию - каталог .vacancy_cache
 		"""
         self.directory = directory
         self.profession = profession
+        self.chunk_rows = chunk_rows
+        self.shared = shared
+        self.processes = processes
+        self.cache = cache or VacancyCache()
         self.raw_data = []
 
     def get_analytics(self):
         """Достает все файлы из директории, анализирует и складывает в поле raw_data"""
-        with multiprocessing.Pool(4) as ex:
-            self.raw_data = ex.map(self.get_data_from_chunk, os.listdir(self.directory))
+        if self.shared:
+            self.get_shared_analytics()
+            return
+        scheduler = TaskScheduler(self.directory, max_workers=self.processes, chunk_rows=self.chunk_rows,
+                                  cache=self.cache)
+        tasks = scheduler.get_tasks()
+        if not tasks:
+            return
+        results = [None] * len(tasks)
+        results[-1], workers = scheduler.measure(self.get_data_from_chunk, tasks)
+        numbered_tasks = list(enumerate(task for task, _ in tasks[:-1]))
+        if workers == 1:
+            results[:-1] = map(self.get_data_from_chunk, (task for _, task in numbered_tasks))
+        else:
+            with multiprocessing.Pool(workers) as ex:
+                for number, result in ex.imap_unordered(self.get_numbered_data, numbered_tasks):
+                    results[number] = result
+        self.raw_data = results
 
-    def get_average(self, data):
-        return data.apply(lambda x: (x['salary_from'] + x['salary_to']) * 0.5, axis=1).mean()
+    def get_numbered_data(self, numbered_task):
+        """Обрабатывает задачу и возвращает результат вместе с ее номером в плане (для imap_unordered)
+		Attributes:
+			numbered_task (tuple): Номер задачи и задача
+		Returns:
+			tuple: номер задачи и YearStatistics
+		"""
+        number, task = numbered_task
+        return number, self.get_data_from_chunk(task)
+
+    def get_shared_analytics(self):
+        """Читает столбцы всех файлов один раз в родительском процессе и копирует их в общую память,
+		процессы получают только названия буферов и границы своей части (offset, length) и считают
+		накопители на представлениях numpy без копирования и повторного разбора данных"""
+        parts = [get_columns(self.directory, task, self.profession, self.cache)
+                 for task in get_tasks(self.directory, cache=self.cache)]
+        columns = [np.concatenate(column) if parts else np.array([]) for column in zip(*parts)]
+        size = len(columns[0]) if columns else 0
+        buffers = []
+        try:
+            for column in columns:
+                buffers.append(shared_memory.SharedMemory(create=True, size=max(column.nbytes, 1)))
+                np.ndarray(column.shape, column.dtype, buffers[-1].buf)[:] = column
+            specs = [(memory.name, column.dtype.str) for memory, column in zip(buffers, columns)]
+            processes = self.processes or os.cpu_count()
+            step = self.chunk_rows or max(math.ceil(size / processes), 1)
+            tasks = [(specs, offset, min(step, size - offset)) for offset in range(0, size, step)]
+            with multiprocessing.Pool(min(processes, max(len(tasks), 1))) as ex:
+                self.raw_data = ex.map(get_shared_statistics, tasks)
+        finally:
+            for memory in buffers:
+                memory.close()
+                memory.unlink()
 
-    def get_data_from_chunk(self, file_name):
-        """Возвращает параметры аналитики одного файла
+    def get_data_from_chunk(self, task):
+        """Возвращает накопители аналитики одной части файла
 		Attributes:
-			file_name (str): Название csv-файла
+			task (tuple): Название csv-файла, первая строка части и строка после последней
 		Returns:
-			year (int): Год публикации вакансии
-			average_salary (int): Средняя зарплата
-			count (int): Количество вакансий
-			average_salary_profession (int): Cредняя зарплата для выбранной профессии
-			count_profession (int): Количество вакансий для выбранной профессии
+			YearStatistics: суммы зарплат и количества вакансий по годам, всего и для выбранной профессии
 		"""
-        data = pd.read_csv(f'{self.directory}/{file_name}')
-        vac = data['name'].str.contains(self.profession)
-        vacancy_data = data[vac]
-        average_salary = round(self.get_average(data))
-        average_salary_profession = round(self.get_average(vacancy_data))
-        count = data.shape[0]
-        count_profession = vacancy_data.shape[0]
-        year = data['published_at'].apply(lambda x: x[:4]).unique()[0]
-        return year, average_salary, count, average_salary_profession, count_profession
+        return get_chunk_statistics(self.directory, task, self.profession, self.cache)
 
     def get_converted_data(self):
-        """Берет сырые данные из поля analyzed_data и разбивает их на словари, выводит их на экран
+        """Объединяет накопители из поля raw_data и разбивает их на словари, выводит их на экран
 		В словаре ключ - год, значение параметр аналитики (средняя зарплата, количество вакансий и т.д.)"""
-        dct_years_salary, dct_years_count, dct_years_salary_filt, dct_years_count_filt = {}, {}, {}, {}
-        for year, average_salary, count_by_year, average_salary_filt, count_by_year_filt in self.raw_data:
-            dct_years_salary[year] = average_salary
-            dct_years_count[year] = count_by_year
-            dct_years_salary_filt[year] = average_salary_filt
-            dct_years_count_filt[year] = count_by_year_filt
+        dct_years_salary, dct_years_count, dct_years_salary_filt, dct_years_count_filt = \
+            merge_statistics(self.raw_data).get_result()
         print(f'Динамика уровня зарплат по годам: {dct_years_salary}')
         print(f'Динамика количества вакансий по годам: {dct_years_count}')
         print(f'Динамика уровня зарплат по годам для выбранной профессии: {dct_years_salary_filt}')
         print(f'Динамика количества вакансий по годам для выбранной профессии: {dct_years_count_filt}')
 
 
+def get_shared_statistics(task):
+    """Считает накопители по части столбцов в общей памяти
+	Attributes:
+		task (tuple): Список пар (название буфера, тип numpy) для годов, зарплат и признака профессии,
+			смещение и длина части
+	Returns:
+		YearStatistics: суммы зарплат и количества вакансий по годам
+	"""
+    specs, offset, length = task
+    buffers = [shared_memory.SharedMemory(name=name) for name, _ in specs]
+    try:
+        views = [np.ndarray((length,), dtype, memory.buf, offset * np.dtype(dtype).itemsize)
+                 for memory, (_, dtype) in zip(buffers, specs)]
+        statistics = YearStatistics()
+        statistics.add(*views)
+        del views
+    finally:
+        for memory in buffers:
+            memory.close()
+    return statistics
+
+
 if __name__ == '__main__':
     directory = 'split_files'
     profession = 'Аналитик'
@@ -0,0 +1,129 @@
+import os
+import numpy as np
+
+
+class NameIndex:
+    ''' Класс NameIndex - инвертированный индекс по триграммам названий вакансий.
+    Триграммы строятся по уникальным названиям в нижнем регистре, для каждого уникального названия
+    хранится список строк, в которых оно встречается, поэтому поиск профессии по подстроке
+    не просматривает все строки набора данных
+    Attributes:
+        names (np.ndarray): уникальные названия вакансий, позиция - код названия
+        trigrams (np.ndarray): отсортированные триграммы
+        trigram_offsets (np.ndarray): границы списков названий для каждой триграммы в trigram_names
+        trigram_names (np.ndarray): коды названий, содержащих триграмму
+        row_offsets (np.ndarray): границы списков строк для каждого названия в rows
+        rows (np.ndarray): номера строк, сгруппированные по коду названия
+        size (int): количество строк в наборе данных
+
+    >>> index = NameIndex.build(np.array([0, 1, 0, 2, -1]), ['Аналитик данных', 'Программист', 'Бизнес-аналитик'])
+    >>> index.find_rows('Аналитик'), index.find_rows('аналитик', case=False), index.find_rows('ист')
+    (array([0, 2]), array([0, 2, 3]), array([1]))
+    >>> index.get_mask('Программист')
+    array([False,  True, False, False, False])
+    '''
+    files = ('names', 'trigrams', 'trigram_offsets', 'trigram_names', 'row_offsets', 'rows')
+
+    def __init__(self, names, trigrams, trigram_offsets, trigram_names, row_offsets, rows, size):
+        '''
+        Инициализирует класс NameIndex (для построения индекса используется NameIndex.build)
+        '''
+        self.names = names
+        self.trigrams = trigrams
+        self.trigram_offsets = trigram_offsets
+        self.trigram_names = trigram_names
+        self.row_offsets = row_offsets
+        self.rows = rows
+        self.size = size
+
+    @staticmethod
+    def get_trigrams(text):
+        '''
+        Возвращает множество триграмм строки
+        :param text: строка
+        :return: множество подстрок длины 3
+        '''
+        return {text[i:i + 3] for i in range(len(text) - 2)}
+
+    @classmethod
+    def build(cls, name_codes, names):
+        '''
+        Строит индекс по столбцу названий, закодированному словарем
+        :param name_codes: коды названий для каждой строки, -1 - пустое название
+        :param names: уникальные названия, позиция - код
+        :return: NameIndex
+        '''
+        name_codes = np.asarray(name_codes)
+        pairs = sorted((trigram, code) for code, name in enumerate(names) for trigram in cls.get_trigrams(name.lower()))
+        trigrams, first = np.unique(np.array([trigram for trigram, _ in pairs], dtype='<U3'), return_index=True)
+        trigram_offsets = np.append(first, len(pairs)).astype(np.int64)
+        trigram_names = np.array([code for _, code in pairs], dtype=np.int32)
+        valid_rows = np.flatnonzero(name_codes >= 0)
+        rows = valid_rows[np.argsort(name_codes[valid_rows], kind='stable')]
+        counts = np.bincount(name_codes[valid_rows], minlength=len(names))
+        row_offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+        return cls(np.array(names, dtype=str), trigrams, trigram_offsets, trigram_names, row_offsets, rows,
+                   len(name_codes))
+
+    def save(self, directory):
+        '''
+        Сохраняет индекс в каталог (по файлу .npy на массив)
+        :param directory: каталог
+        '''
+        os.makedirs(directory, exist_ok=True)
+        for name in self.files:
+            np.save(os.path.join(directory, f'{name}.npy'), getattr(self, name))
+        np.save(os.path.join(directory, 'size.npy'), np.array(self.size))
+
+    @classmethod
+    def load(cls, directory):
+        '''
+        Загружает индекс из каталога, список строк отображается в память
+        :param directory: каталог
+        :return: NameIndex
+        '''
+        arrays = [np.load(os.path.join(directory, f'{name}.npy'), mmap_mode='r' if name == 'rows' else None)
+                  for name in cls.files]
+        return cls(*arrays, int(np.load(os.path.join(directory, 'size.npy'))))
+
+    def find_names(self, profession, case=True):
+        '''
+        Находит коды названий, содержащих профессию
+        :param profession: название профессии
+        :param case: учитывать регистр (как `in` в main.py), False - как str.contains(case=False)
+        :return: np.ndarray с кодами названий
+        '''
+        query = profession.lower()
+        candidates = np.arange(len(self.names))
+        for trigram in self.get_trigrams(query):
+            position = np.searchsorted(self.trigrams, trigram)
+            if position == len(self.trigrams) or self.trigrams[position] != trigram:
+                return np.array([], dtype=np.int64)
+            postings = self.trigram_names[self.trigram_offsets[position]:self.trigram_offsets[position + 1]]
+            candidates = np.intersect1d(candidates, postings, assume_unique=True)
+        if case:
+            return np.array([code for code in candidates if profession in self.names[code]], dtype=np.int64)
+        return np.array([code for code in candidates if query in self.names[code].lower()], dtype=np.int64)
+
+    def find_rows(self, profession, case=True):
+        '''
+        Находит номера строк, в которых название содержит профессию
+        :param profession: название профессии
+        :param case: учитывать регистр
+        :return: отсортированный np.ndarray с номерами строк
+        '''
+        codes = self.find_names(profession, case)
+        if len(codes) == 0:
+            return np.array([], dtype=np.int64)
+        return np.sort(np.concatenate([self.rows[self.row_offsets[code]:self.row_offsets[code + 1]] for code in codes]))
+
+    def get_mask(self, profession, case=True):
+        '''
+        Возвращает маску строк набора данных, в которых название содержит профессию
+        :param profession: название профессии
+        :param case: учитывать регистр
+        :return: np.ndarray из bool длиной size
+        '''
+        mask = np.zeros(self.size, dtype=bool)
+        mask[self.find_rows(profession, case)] = True
+        return mask
@@ -0,0 +1,189 @@
+import os
+import shutil
+import matplotlib
+from fpdf import FPDF
+import pdfkit
+import instrumentation
+from report_service import render_template
+
+env_variable = 'VACANCY_PDF_BACKEND'
+backends = {}
+
+
+class PdfBackend:
+    ''' Класс PdfBackend - общий интерфейс создания pdf-отчетов. Отчет описывается названием шаблона
+    из каталога other и словарем с данными для него, поэтому отчеты не зависят от способа записи pdf
+    '''
+    def write(self, template_name, context, out_file):
+        '''
+        Создает pdf-файл
+        :param template_name: название шаблона (pdf_template.html или template_upd.html)
+        :param context: данные для шаблона
+        :param out_file: название pdf-файла
+        '''
+        raise NotImplementedError
+
+
+class PdfkitBackend(PdfBackend):
+    ''' Класс PdfkitBackend рендерит html-шаблон и передает его wkhtmltopdf (отдельный процесс на каждый отчет)
+    Шаблоны рендерятся общим окружением процесса (report_service.get_environment)
+    Attributes:
+        template_dir (str): каталог шаблонов
+        configuration (pdfkit.configuration): путь к wkhtmltopdf
+    '''
+    default_path = r'C:\Program Files\wkhtmltopdf\bin\wkhtmltopdf.exe'
+
+    def __init__(self, wkhtmltopdf=None, template_dir='other'):
+        '''
+        Инициализирует класс PdfkitBackend
+        :param wkhtmltopdf: путь к wkhtmltopdf, по умолчанию - из переменной WKHTMLTOPDF, PATH или путь Windows
+        :param template_dir: каталог шаблонов
+        '''
+        self.template_dir = template_dir
+        wkhtmltopdf = wkhtmltopdf or os.environ.get('WKHTMLTOPDF') or shutil.which('wkhtmltopdf') or self.default_path
+        self.configuration = pdfkit.configuration(wkhtmltopdf=wkhtmltopdf)
+
+    def write(self, template_name, context, out_file):
+        with instrumentation.stage('pdf.render'):
+            html = render_template(template_name, context, self.template_dir)
+        with instrumentation.stage('pdf.write'):
+            pdfkit.from_string(html, out_file, configuration=self.configuration,
+                               options={"enable-local-file-access": ""})
+
+
+class FpdfBackend(PdfBackend):
+    ''' Класс FpdfBackend рисует таблицы шаблонов напрямую через fpdf2 в текущем процессе (без wkhtmltopdf).
+    Кириллица выводится шрифтом DejaVu Sans Bold, который поставляется вместе с matplotlib
+    (в шаблонах весь текст жирный - заголовки и ячейки th, поэтому в документ загружается один шрифт)
+    Attributes:
+        font_dir (str): каталог со шрифтом DejaVuSans-Bold.ttf
+        layouts (dict): ключ - название шаблона, значение - метод, рисующий его таблицы
+    '''
+    layouts = {'pdf_template.html': 'draw_year_report', 'template_upd.html': 'draw_city_report'}
+    line_height = 6
+    padding = 1.5
+
+    def __init__(self, font_dir=None):
+        '''
+        Инициализирует класс FpdfBackend
+        :param font_dir: каталог со шрифтами, по умолчанию - шрифты matplotlib
+        '''
+        self.font_dir = font_dir or os.path.join(matplotlib.get_data_path(), 'fonts', 'ttf')
+
+    def write(self, template_name, context, out_file):
+        with instrumentation.stage('pdf.render'):
+            pdf = FPDF()
+            pdf.add_font('DejaVu', 'B', os.path.join(self.font_dir, 'DejaVuSans-Bold.ttf'))
+            pdf.add_page()
+            getattr(self, self.layouts[template_name])(pdf, context)
+        with instrumentation.stage('pdf.write'):
+            pdf.output(out_file)
+
+    @staticmethod
+    def draw_heading(pdf, text, size):
+        '''
+        Рисует заголовок по центру страницы
+        :param pdf: документ
+        :param text: текст
+        :param size: размер шрифта
+        '''
+        pdf.set_font('DejaVu', 'B', size)
+        pdf.multi_cell(0, size * 0.5, text, align='C', new_x='LMARGIN', new_y='NEXT')
+        pdf.ln(4)
+
+    def draw_table(self, pdf, header, rows, width=None, x=None):
+        '''
+        Рисует таблицу ячейками с рамками (все ячейки жирные и по центру, как th в шаблонах).
+        Длинные заголовки переносятся по словам, строка не разрывается между страницами
+        :param pdf: документ
+        :param header: заголовок
+        :param rows: строки
+        :param width: ширина таблицы, по умолчанию - вся ширина страницы
+        :param x: левый край таблицы, по умолчанию таблица ставится по центру
+        '''
+        width = width or pdf.epw
+        x = pdf.l_margin + (pdf.epw - width) / 2 if x is None else x
+        column = width / len(header)
+        pdf.set_font('DejaVu', 'B', 10)
+        header_lines = [pdf.multi_cell(column - 2 * self.padding, self.line_height, str(value),
+                                       dry_run=True, output='LINES') for value in header]
+        self.draw_row(pdf, x, column, ['\n'.join(lines) for lines in header_lines], max(map(len, header_lines)))
+        for row in rows:
+            self.draw_row(pdf, x, column, [str(value) for value in row], 1)
+
+    def draw_row(self, pdf, x, column, values, lines):
+        '''
+        Рисует строку таблицы
+        :param pdf: документ
+        :param x: левый край таблицы
+        :param column: ширина столбца
+        :param values: тексты ячеек (строки текста разделены \\n)
+        :param lines: высота строки в строках текста
+        '''
+        height = lines * self.line_height + 2 * self.padding
+        if pdf.get_y() + height > pdf.page_break_trigger:
+            pdf.add_page()
+        y = pdf.get_y()
+        for number, value in enumerate(values):
+            left = x + number * column
+            pdf.rect(left, y, column, height)
+            value_lines = value.split('\n')
+            for line_number, line in enumerate(value_lines):
+                pdf.set_xy(left, y + self.padding + (lines - len(value_lines)) * self.line_height / 2 +
+                           line_number * self.line_height)
+                pdf.cell(column, self.line_height, line, align='C')
+        pdf.set_xy(pdf.l_margin, y + height)
+
+    def draw_year_report(self, pdf, context):
+        '''
+        Рисует отчет по шаблону pdf_template.html
+        :param pdf: документ
+        :param context: name - профессия, statistic - строки статистики по годам
+        '''
+        name = context['name']
+        self.draw_heading(pdf, f'Аналитика для профессии {name}', 16)
+        self.draw_table(pdf, ['Год', 'Средняя зарплата', f'Средняя зарплата - {name}', 'Количество вакансий',
+                              f'Количество вакансий - {name}'], context['statistic'])
+
+    def draw_city_report(self, pdf, context):
+        '''
+        Рисует отчет по шаблону template_upd.html: таблица по годам и две таблицы по городам рядом
+        :param pdf: документ
+        :param context: name, area, years_and_area, salary_by_city, parts_city
+            (таблицы по городам переносятся на новую страницу целиком, чтобы остаться рядом)
+        '''
+        name = context['name']
+        self.draw_heading(pdf, f'Аналитика по профессии {name}', 16)
+        self.draw_heading(pdf, f'Статистика по профессии {name} в городе {context["area"]}', 12)
+        self.draw_table(pdf, ['Год', 'Средняя зарплата', 'Количество вакансий'], context['years_and_area'],
+                        pdf.epw * 0.6)
+        pdf.ln(6)
+        self.draw_heading(pdf, 'Статистика по городам', 12)
+        rows = max(len(context['salary_by_city']), len(context['parts_city'])) + 1
+        if pdf.get_y() + rows * (self.line_height + 2 * self.padding) > pdf.page_break_trigger:
+            pdf.add_page()
+        top = pdf.get_y()
+        self.draw_table(pdf, ['Город', 'Средняя зарплата'], context['salary_by_city'], pdf.epw * 0.47, pdf.l_margin)
+        bottom = pdf.get_y()
+        pdf.set_y(top)
+        self.draw_table(pdf, ['Город', 'Доля вакансий'], context['parts_city'], pdf.epw * 0.47,
+                        pdf.l_margin + pdf.epw * 0.53)
+        pdf.set_y(max(bottom, pdf.get_y()))
+
+
+def get_backend(name=None):
+    '''
+    Возвращает общий для процесса pdf-бэкенд (создается один раз, поэтому в одном процессе
+    можно создавать сотни отчетов без повторной настройки)
+    :param name: 'fpdf' или 'pdfkit', по умолчанию - из переменной VACANCY_PDF_BACKEND или 'fpdf'
+    :return: PdfBackend
+    '''
+    name = name or os.environ.get(env_variable) or 'fpdf'
+    if name not in backends:
+        if name == 'fpdf':
+            backends[name] = FpdfBackend()
+        elif name == 'pdfkit':
+            backends[name] = PdfkitBackend()
+        else:
+            raise ValueError(f'Неизвестный pdf-бэкенд: {name}')
+    return backends[name]
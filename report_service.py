@@ -0,0 +1,170 @@
+import importlib
+import os
+from concurrent.futures import ProcessPoolExecutor
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+import instrumentation
+from vacancy_cache import VacancyCache
+from vacancy_db import VacancyDatabase
+
+environments = {}
+worker_state = {}
+
+
+def get_environment(template_dir='other', cache_dir='.jinja_cache'):
+    '''
+    Возвращает общее для процесса окружение jinja: шаблон компилируется один раз на процесс,
+    а скомпилированный байткод сохраняется в cache_dir и переиспользуется новыми процессами.
+    Шаблоны рендерит только PdfkitBackend, FpdfBackend (бэкенд по умолчанию) рисует таблицы сам
+    и окружение jinja не использует
+    :param template_dir: каталог шаблонов
+    :param cache_dir: каталог байткода шаблонов, None - без кэша байткода
+    :return: Environment
+
+    >>> get_environment(cache_dir=None) is get_environment(cache_dir=None)
+    True
+    '''
+    key = (os.path.abspath(template_dir), cache_dir)
+    if key not in environments:
+        bytecode_cache = None
+        if cache_dir is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+            bytecode_cache = FileSystemBytecodeCache(cache_dir)
+        environments[key] = Environment(loader=FileSystemLoader(template_dir), bytecode_cache=bytecode_cache)
+    return environments[key]
+
+
+def render_template(template_name, context, template_dir='other'):
+    '''
+    Рендерит html-шаблон общим окружением процесса
+    :param template_name: название шаблона
+    :param context: данные для шаблона
+    :param template_dir: каталог шаблонов
+    :return: html-строка
+    '''
+    return get_environment(template_dir).get_template(template_name).render(context)
+
+
+def get_out_file(directory, profession, area):
+    '''
+    Возвращает имя pdf-файла отчета (общее для пула и make_batch_pdfs в 342.py и 343.py)
+    :param directory: каталог для pdf-файлов
+    :param profession: профессия
+    :param area: город, None - отчет по годам (342)
+    :return: путь к pdf-файлу
+
+    >>> os.path.basename(get_out_file('reports', 'аналитик', None))
+    'аналитик.pdf'
+    >>> os.path.basename(get_out_file('reports', 'аналитик', 'Москва'))
+    'аналитик_Москва.pdf'
+    '''
+    return os.path.join(directory, f'{profession}.pdf' if area is None else f'{profession}_{area}.pdf')
+
+
+def warm_templates(template_names=('pdf_template.html', 'template_upd.html')):
+    '''
+    Компилирует шаблоны в кэш байткода jinja, если pdf-бэкенд процесса рендерит html (PdfkitBackend)
+    :param template_names: названия шаблонов
+    :return: True, если шаблоны скомпилированы
+    '''
+    pdf_backends = importlib.import_module('pdf_backends')
+    backend = pdf_backends.get_backend()
+    if not isinstance(backend, pdf_backends.PdfkitBackend):
+        return False
+    environment = get_environment(backend.template_dir)
+    for template_name in template_names:
+        environment.get_template(template_name)
+    return True
+
+
+def init_worker(file_name, directory):
+    '''
+    Подготавливает процесс пула: отчеты создаются при первой задаче и затем переиспользуются,
+    поэтому вакансии (или соединение с бд) открываются один раз на процесс
+    :param file_name: файл с вакансиями (.csv) или бд (.db)
+    :param directory: каталог для pdf-файлов
+    '''
+    worker_state.clear()
+    worker_state.update(file_name=file_name, directory=directory)
+
+
+def get_worker_report(area):
+    '''
+    Возвращает отчет процесса: 342.Report для задач без города или 343.Report с аналитикой по городам
+    (она не зависит от профессии и считается один раз на процесс)
+    :param area: город
+    :return: отчет и аналитика по городам (None для 342.Report)
+    '''
+    kind = 'year' if area is None else 'city'
+    if kind not in worker_state:
+        file_name = worker_state['file_name']
+        database = VacancyDatabase(file_name) if file_name.endswith('.db') else None
+        cache = None if database is not None else VacancyCache()
+        if kind == 'year':
+            worker_state[kind] = importlib.import_module('342').Report(file_name, '', database, cache), None
+        else:
+            report = importlib.import_module('343').Report(file_name, '', area, database, cache)
+            worker_state[kind] = report, report.get_data_for_all_city()
+    return worker_state[kind]
+
+
+def render_job(job):
+    '''
+    Создает pdf-файл для одной задачи (выполняется в процессе пула)
+    :param job: профессия и город (None - отчет по годам)
+    :return: путь к pdf-файлу
+    '''
+    profession, area = job
+    report, city_data = get_worker_report(area)
+    report.set_profession(profession)
+    out_file = get_out_file(worker_state['directory'], profession, area)
+    if area is None:
+        report.make_pdf(out_file)
+    else:
+        report.area = area
+        report.make_pdf(out_file, city_data)
+    return out_file
+
+
+def render_reports(file_name, jobs, directory='reports', workers=None, chunksize=4):
+    '''
+    Создает pdf-файлы для пакета задач (профессия, город) в пуле процессов. Каждый процесс один раз
+    открывает вакансии и создает pdf-бэкенд, на отчет остаются только аналитика по профессии и запись файла.
+    Запись кэша и индекс названий создаются заранее в родительском процессе, чтобы процессы пула
+    не разбирали один и тот же файл одновременно. Для PdfkitBackend родитель также компилирует шаблоны
+    в кэш байткода jinja (процессы пула загружают байткод), для FpdfBackend шаблоны не нужны
+    :param file_name: файл с вакансиями (.csv) или бд (.db)
+    :param jobs: список пар (профессия, город), город None - отчет по годам
+    :param directory: каталог для pdf-файлов
+    :param workers: количество процессов, по умолчанию - os.cpu_count()
+    :param chunksize: сколько задач передается процессу за раз
+    :return: список путей к pdf-файлам в порядке задач
+    '''
+    os.makedirs(directory, exist_ok=True)
+    workers = min(workers or os.cpu_count() or 1, len(jobs))
+    if workers <= 1:
+        init_worker(file_name, directory)
+        return [render_job(job) for job in jobs]
+    if not file_name.endswith('.db'):
+        VacancyCache().get_name_index(file_name)
+    warm_templates()
+    with ProcessPoolExecutor(workers, initializer=init_worker, initargs=(file_name, directory)) as executor:
+        return list(executor.map(render_job, jobs, chunksize=chunksize))
+
+
+def read_jobs(file_name):
+    '''
+    Читает задачи из файла: в каждой строке профессия и, через точку с запятой, город
+    :param file_name: название файла
+    :return: список пар (профессия, город или None)
+    '''
+    with open(file_name, encoding='utf-8-sig') as file:
+        jobs = [line.strip().partition(';') for line in file if line.strip()]
+    return [(profession.strip().lower(), area.strip() or None) for profession, _, area in jobs]
+
+
+if __name__ == '__main__':
+    instrumentation.enable_from_args()
+    file_name = input('Введите название файла: ')
+    jobs_file = input('Введите название файла с задачами (профессия;город): ')
+    for path in render_reports(file_name, read_jobs(jobs_file)):
+        print(path)
@@ -1,18 +1,23 @@
 import pandas as pd
 import sqlite3
+from dates import get_year_months
+from vacancy_db import VacancyDatabase
 
 
 class ConvertVacancy:
     ''' Класс ConvertVacancy превращает несколько полей о зарплате в одно и формирует таблицу в бд
     Attributes:
         file_name (DataFrame): исходный файл с вакансиями
+        connection (sqlite3.Connection): соединение с бд, в которой есть таблица курсов currency_values_03_22
     '''
-    def __init__(self, file_name):
+    def __init__(self, file_name, connection):
         '''
         Инициализирует класс ConvertVacancy
         :param file_name:  исходный файл с вакансиями
+        :param connection: соединение с бд с таблицей курсов
         '''
         self.file_name = pd.read_csv(file_name)
+        self.connection = connection
 
     def get_converted_currency_salary(self, currency, date):
         '''
@@ -23,7 +28,7 @@ class ConvertVacancy:
         '''
         sqlite_data = f"select {currency} from currency_values_03_22 where date = ?"
         try:
-            return cursor.execute(sqlite_data, (date,)).fetchone()[0]
+            return self.connection.execute(sqlite_data, (date,)).fetchone()[0]
         except:
             return None
 
@@ -61,13 +66,74 @@ class ConvertVacancy:
         '''
         data = self.file_name.copy()
         data['salary'] = data.apply(lambda x: self.get_salary_row(x), axis=1)
-        data['published_at'] = data['published_at'][:7]
+        data['published_at'] = get_year_months(data['published_at'])
         data[['name', 'salary', 'area_name', 'published_at']].to_sql('YagodkinaVera',
-                                                                     con=sqlite_connection, index=False)
+                                                                     con=self.connection, index=False)
+
+    @staticmethod
+    def get_salary_sql(connection):
+        '''
+        Формирует SQL-выражение, которое считает зарплату по тем же правилам, что и get_salary_row,
+        для строки vacancies_staging (v), соединенной с currency_values_03_22 (c) по месяцу
+        :param connection: соединение с бд
+        :return: SQL-выражение для поля salary
+        '''
+        currencies = [column[1] for column in connection.execute('pragma table_info(currency_values_03_22)')
+                      if column[1] != 'date']
+        conv = "case v.salary_currency when 'RUR' then 1 " + \
+               ' '.join(f'when \'{currency}\' then c."{currency}"' for currency in currencies) + ' end'
+        salary_from, salary_to = 'coalesce(v.salary_from, 0)', 'coalesce(v.salary_to, 0)'
+        average_salary = f'case when {salary_to} = 0 or {salary_from} = 0 then max({salary_to}, {salary_from}) ' \
+                         f'else 0.5 * ({salary_to} + {salary_from}) end'
+        return f'case when v.salary_currency is null or (v.salary_from is null and v.salary_to is null) ' \
+               f'or coalesce({conv}, 0) = 0 then null else py_round({average_salary} * ({conv})) end'
+
+    def make_sql_bulk(self, connection=None, batch_size=100000, wal=False, single_transaction=True):
+        '''
+        создает новую таблицу в базе данных без запросов на каждую вакансию: вакансии пачками загружаются
+        в промежуточную таблицу, а зарплата считается одним запросом с JOIN по месяцу с таблицей курсов.
+        Таблица создается с типизированной схемой и индексами VacancyDatabase
+        :param connection: соединение с бд, по умолчанию - connection объекта
+        :param batch_size: количество строк в одном executemany
+        :param wal: на время загрузки включить журнал WAL (после загрузки прежний режим журнала восстанавливается,
+            чтобы рядом с файлом бд не оставались -wal и -shm)
+        :param single_transaction: загрузить все в одной транзакции, иначе фиксировать каждую пачку
+        :return: таблица в бд
+        '''
+        connection = connection or self.connection
+        journal_mode = connection.execute('pragma journal_mode').fetchone()[0]
+        if wal:
+            connection.execute('pragma journal_mode = wal')
+            connection.execute('pragma synchronous = normal')
+        connection.create_function('py_round', 1, lambda x: None if x is None else round(x, 0), deterministic=True)
+        connection.execute('create index if not exists currency_values_03_22_date on currency_values_03_22 (date)')
+        connection.execute('drop table if exists temp.vacancies_staging')
+        connection.execute('create temp table vacancies_staging (name text, salary_from real, salary_to real, '
+                           'salary_currency text, area_name text, published_at text)')
+        columns = ['name', 'salary_from', 'salary_to', 'salary_currency', 'area_name', 'published_at']
+        data = self.file_name[columns].astype(object)
+        data = data.where(pd.notnull(data), None)
+        for start in range(0, data.shape[0], batch_size):
+            rows = data.iloc[start:start + batch_size].itertuples(index=False, name=None)
+            connection.executemany('insert into vacancies_staging values (?, ?, ?, ?, ?, ?)', rows)
+            if not single_transaction:
+                connection.commit()
+        database = VacancyDatabase(connection)
+        database.create_table(replace=True)
+        connection.execute(f'insert into {database.table} (name, salary, area_name, published_at, year) '
+                           f'select v.name, {self.get_salary_sql(connection)}, v.area_name, '
+                           f'substr(v.published_at, 1, 7), cast(substr(v.published_at, 1, 4) as integer) '
+                           f'from vacancies_staging v '
+                           f'left join currency_values_03_22 c on c.date = substr(v.published_at, 1, 7)')
+        connection.execute('drop table temp.vacancies_staging')
+        connection.commit()
+        database.create_indexes()
+        if wal:
+            connection.execute(f'pragma journal_mode = {journal_mode}')
 
 
-sqlite_connection = sqlite3.connect('currency_values_03_22.db')
-cursor = sqlite_connection.cursor()
-file_name = 'vacancies_dif_currencies.csv'
-result = ConvertVacancy(file_name)
-result.make_sql()
+if __name__ == '__main__':
+    sqlite_connection = sqlite3.connect('currency_values_03_22.db')
+    file_name = 'vacancies_dif_currencies.csv'
+    result = ConvertVacancy(file_name, sqlite_connection)
+    result.make_sql_bulk()
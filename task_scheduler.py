@@ -0,0 +1,91 @@
+import math
+import os
+import time
+from vacancy_cache import VacancyCache
+
+
+class TaskScheduler:
+    ''' Класс TaskScheduler планирует обработку csv-файлов каталога в пуле процессов.
+    Задачи упорядочиваются от больших к меньшим по размеру в байтах, слишком большие файлы делятся
+    на части по строкам, а количество процессов выбирается по числу ядер и измеренной стоимости задачи,
+    поэтому самый большой год не определяет общее время работы
+    Attributes:
+        directory (str): каталог с csv-файлами
+        max_workers (int): наибольшее количество процессов, по умолчанию - количество ядер
+        split_factor (int): на сколько задач в среднем приходится на один процесс при делении больших файлов
+        chunk_rows (int): фиксированное количество строк в задаче, None - выбирается по размеру файлов
+        cache (VacancyCache): кэш, из которого берется количество строк в уже разобранных файлах
+    '''
+    process_cost = 0.05
+
+    def __init__(self, directory, max_workers=None, split_factor=4, chunk_rows=None, cache=None):
+        '''
+        Инициализирует класс TaskScheduler
+        :param directory: каталог с csv-файлами
+        :param max_workers: наибольшее количество процессов
+        :param split_factor: среднее количество задач на процесс
+        :param chunk_rows: фиксированное количество строк в задаче
+        :param cache: кэш (VacancyCache)
+        '''
+        self.directory = directory
+        self.max_workers = max_workers or os.cpu_count()
+        self.split_factor = split_factor
+        self.chunk_rows = chunk_rows
+        self.cache = cache or VacancyCache()
+
+    def get_tasks(self):
+        '''
+        Составляет список задач от больших к меньшим. Файл больше, чем общий размер / (max_workers * split_factor),
+        делится на части с равным количеством строк. Количество строк берется только из готовых записей кэша:
+        файл без записи не разбирается в родительском процессе, а становится одной задачей
+        (строка после последней None - до конца файла), и запись кэша создает процесс, который его обработает.
+        Для делимых файлов индекс названий строится здесь один раз, а не в каждом процессе
+        :return: список пар (задача (название файла, первая строка, строка после последней), размер в байтах)
+        '''
+        files = [(file_name, os.path.getsize(os.path.join(self.directory, file_name)))
+                 for file_name in os.listdir(self.directory)]
+        target_size = max(sum(size for _, size in files) / (self.max_workers * self.split_factor), 1)
+        tasks = []
+        for file_name, size in files:
+            path = os.path.join(self.directory, file_name)
+            entry = self.cache.find_entry(path)
+            if entry is None:
+                tasks.append(((file_name, 0, None), size))
+                continue
+            rows = entry[1]['rows']
+            step = self.chunk_rows or math.ceil(rows / math.ceil(size / target_size)) or 1
+            if step < rows:
+                self.cache.get_name_index(path)
+            tasks.extend(((file_name, start, min(start + step, rows)), size * (min(start + step, rows) - start) / rows)
+                         for start in range(0, rows, step))
+        return sorted(tasks, key=lambda task: (-task[1], task[0]))
+
+    def get_workers(self, seconds, size, total_size, tasks_count):
+        '''
+        Выбирает количество процессов: запуск процесса должен окупаться оставшейся работой
+        :param seconds: измеренное время одной задачи
+        :param size: размер измеренной задачи в байтах
+        :param total_size: размер оставшихся задач в байтах
+        :param tasks_count: количество оставшихся задач
+        :return: количество процессов, 1 - обработка без пула
+
+        >>> scheduler = TaskScheduler('.', max_workers=8)
+        >>> scheduler.get_workers(0.001, 1000, 10000, 10), scheduler.get_workers(1.0, 1000, 10000, 10)
+        (1, 8)
+        '''
+        estimated = seconds * total_size / max(size, 1)
+        return max(1, min(self.max_workers, tasks_count, int(estimated / self.process_cost)))
+
+    def measure(self, function, tasks):
+        '''
+        Выполняет самую маленькую задачу в текущем процессе и по ее времени выбирает количество процессов
+        для остальных задач
+        :param function: функция, обрабатывающая задачу
+        :param tasks: список пар (задача, размер) от get_tasks
+        :return: результат самой маленькой задачи и количество процессов
+        '''
+        task, size = tasks[-1]
+        start = time.perf_counter()
+        result = function(task)
+        seconds = time.perf_counter() - start
+        return result, self.get_workers(seconds, size, sum(size for _, size in tasks[:-1]), len(tasks) - 1)
@@ -1,22 +1,44 @@
+import os
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 import pandas as pd
-import threading
+from dates import get_years
 
 
 class DataSet:
     def __init__(self, file_name):
         self.data = pd.read_csv(file_name)
 
-    def makeResult(self):
-        for year in self.data['published_at'].apply(lambda x: x[:4]).unique():
-            filter_parametr = self.data['published_at'].str.contains(year)
-            filtered_data = self.data[filter_parametr]
-            t = threading.Thread(target=makePartsCsv, args=(filtered_data, f'split_files/vacancies_by_{year}.csv'))
-            t.start()
+    def makeResult(self, directory='split_files', max_workers=4):
+        '''
+        Делит вакансии по годам: год вычисляется один раз, строки группируются за один проход,
+        файлы записываются пулом из max_workers потоков, метод дожидается окончания записи.
+        Одновременно в работе не больше max_workers групп: следующая группа выделяется только после
+        записи одной из предыдущих, поэтому в памяти не держатся копии всех лет сразу
+        :param directory: каталог для файлов vacancies_by_{year}.csv
+        :param max_workers: количество потоков записи
+        :return: список записанных файлов
+        '''
+        os.makedirs(directory, exist_ok=True)
+        years = get_years(self.data['published_at'])
+        futures, pending = {}, set()
+        with ThreadPoolExecutor(max_workers) as executor:
+            for year, data in self.data.groupby(years, sort=False):
+                if len(pending) >= max_workers:
+                    _, pending = wait(pending, return_when=FIRST_COMPLETED)
+                future = executor.submit(makePartsCsv, data, os.path.join(directory, f'vacancies_by_{year}.csv'))
+                futures[future] = year
+                pending.add(future)
+        errors = [f'{futures[future]}: {future.exception()!r}' for future in futures if future.exception()]
+        if errors:
+            raise RuntimeError('Не удалось записать файлы за годы: ' + ', '.join(errors))
+        return [future.result() for future in futures]
 
 
 def makePartsCsv(data: pd.DataFrame, file_name):
     data.to_csv(path_or_buf=file_name, index=False, encoding='utf-8-sig')
+    return file_name
 
 
-data = DataSet('vacancies_by_year.csv')
-data.makeResult()
+if __name__ == '__main__':
+    data = DataSet('vacancies_by_year.csv')
+    data.makeResult()
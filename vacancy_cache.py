@@ -0,0 +1,239 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+from name_index import NameIndex
+
+
+class VacancyCache:
+    ''' Класс VacancyCache хранит разобранные csv-файлы с вакансиями в двоичном колоночном виде.
+    Числовые столбцы сохраняются в .npy и при повторном чтении отображаются в память (mmap),
+    строковые столбцы хранятся как коды (.npy) и словарь уникальных значений.
+    Запись кэша привязана к пути, размеру, времени изменения и хэшу содержимого файла,
+    поэтому измененный файл разбирается заново, а старая запись удаляется.
+    Attributes:
+        directory (str): каталог кэша
+        max_size (int): предельный размер каталога кэша в байтах, при превышении удаляются
+            давно не использованные записи
+    '''
+    hash_block_size = 2 ** 20
+
+    def __init__(self, directory='.vacancy_cache', max_size=2 ** 30):
+        '''
+        Инициализирует класс VacancyCache
+        :param directory: каталог кэша
+        :param max_size: предельный размер каталога кэша в байтах
+        '''
+        self.directory = directory
+        self.max_size = max_size
+
+    def get_fingerprint(self, file_name):
+        '''
+        Вычисляет отпечаток файла. Хэш считается по первому и последнему мегабайту файла и его размеру,
+        чтобы проверка не требовала полного чтения многогигабайтных выгрузок
+        :param file_name: путь к csv-файлу
+        :return: словарь с путем, размером, временем изменения и хэшем содержимого
+        '''
+        stat = os.stat(file_name)
+        content_hash = hashlib.sha1(str(stat.st_size).encode())
+        with open(file_name, 'rb') as file:
+            content_hash.update(file.read(self.hash_block_size))
+            if stat.st_size > self.hash_block_size:
+                file.seek(max(stat.st_size - self.hash_block_size, self.hash_block_size))
+                content_hash.update(file.read())
+        return {'path': os.path.abspath(file_name), 'size': stat.st_size, 'mtime': stat.st_mtime_ns,
+                'hash': content_hash.hexdigest()}
+
+    def get_entry_path(self, fingerprint):
+        '''
+        Возвращает каталог записи кэша для отпечатка файла
+        :param fingerprint: отпечаток файла
+        :return: путь к каталогу записи
+        '''
+        key = f"{fingerprint['path']}|{fingerprint['size']}|{fingerprint['mtime']}|{fingerprint['hash']}"
+        return os.path.join(self.directory, hashlib.sha1(key.encode()).hexdigest())
+
+    def get_entries(self):
+        '''
+        Возвращает все записи кэша
+        :return: список пар (каталог записи, метаданные)
+        '''
+        if not os.path.isdir(self.directory):
+            return []
+        entries = []
+        for name in os.listdir(self.directory):
+            meta_path = os.path.join(self.directory, name, 'meta.json')
+            if os.path.isfile(meta_path):
+                with open(meta_path, encoding='utf-8') as file:
+                    entries.append((os.path.join(self.directory, name), json.load(file)))
+        return entries
+
+    def invalidate(self, file_name, keep=None):
+        '''
+        Удаляет все записи кэша для файла
+        :param file_name: путь к csv-файлу
+        :param keep: каталог записи, который удалять нельзя (актуальная запись)
+        '''
+        path = os.path.abspath(file_name)
+        for entry_path, meta in self.get_entries():
+            if meta['path'] == path and entry_path != keep:
+                shutil.rmtree(entry_path, ignore_errors=True)
+
+    def clear(self):
+        '''Удаляет каталог кэша целиком'''
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def evict(self, keep=None):
+        '''
+        Удаляет давно не использованные записи, пока размер кэша больше max_size
+        :param keep: каталог записи, который удалять нельзя (только что созданная запись)
+        '''
+        entries = []
+        for entry_path, _ in self.get_entries():
+            size = sum(entry.stat().st_size for entry in os.scandir(entry_path))
+            entries.append((os.path.getmtime(os.path.join(entry_path, 'meta.json')), size, entry_path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry_path in sorted(entries):
+            if total <= self.max_size:
+                break
+            if entry_path != keep:
+                shutil.rmtree(entry_path, ignore_errors=True)
+                total -= size
+
+    def store(self, file_name, fingerprint):
+        '''
+        Разбирает csv-файл и сохраняет его столбцы в кэш. Запись собирается во временном каталоге
+        и переименовывается целиком, поэтому несколько процессов могут сохранять один файл одновременно:
+        если запись уже создана другим процессом, используется она. Записи с устаревшим отпечатком
+        удаляются только после появления актуальной
+        :param file_name: путь к csv-файлу
+        :param fingerprint: отпечаток файла
+        :return: каталог созданной записи
+        '''
+        data = pd.read_csv(file_name, encoding='utf-8-sig', keep_default_na=False, na_values=[''],
+                           on_bad_lines='skip')
+        os.makedirs(self.directory, exist_ok=True)
+        entry_path = self.get_entry_path(fingerprint)
+        temp_path = tempfile.mkdtemp(dir=self.directory)
+        try:
+            columns = []
+            for number, name in enumerate(data.columns):
+                column = data[name]
+                if pd.api.types.is_numeric_dtype(column):
+                    np.save(os.path.join(temp_path, f'{number}.npy'), column.to_numpy())
+                    columns.append({'name': name, 'kind': 'numeric'})
+                else:
+                    codes, values = pd.factorize(column, sort=False)
+                    np.save(os.path.join(temp_path, f'{number}.codes.npy'), codes.astype(np.int32))
+                    np.save(os.path.join(temp_path, f'{number}.values.npy'), np.array(values, dtype=str))
+                    columns.append({'name': name, 'kind': 'string'})
+            with open(os.path.join(temp_path, 'meta.json'), 'w', encoding='utf-8') as file:
+                json.dump(dict(fingerprint, columns=columns, rows=len(data)), file, ensure_ascii=False)
+            try:
+                os.replace(temp_path, entry_path)
+            except OSError:
+                if not os.path.isfile(os.path.join(entry_path, 'meta.json')):
+                    raise
+        finally:
+            shutil.rmtree(temp_path, ignore_errors=True)
+        self.invalidate(file_name, keep=entry_path)
+        self.evict(keep=entry_path)
+        return entry_path
+
+    def find_entry(self, file_name):
+        '''
+        Возвращает актуальную запись кэша для файла, не разбирая файл, если записи нет
+        :param file_name: путь к csv-файлу
+        :return: каталог записи и ее метаданные или None
+        '''
+        entry_path = self.get_entry_path(self.get_fingerprint(file_name))
+        meta_path = os.path.join(entry_path, 'meta.json')
+        if not os.path.isfile(meta_path):
+            return None
+        os.utime(meta_path)
+        with open(meta_path, encoding='utf-8') as file:
+            return entry_path, json.load(file)
+
+    def get_entry(self, file_name):
+        '''
+        Возвращает актуальную запись кэша для файла, при необходимости создавая ее
+        :param file_name: путь к csv-файлу
+        :return: каталог записи и ее метаданные
+        '''
+        entry = self.find_entry(file_name)
+        if entry is not None:
+            return entry
+        entry_path = self.store(file_name, self.get_fingerprint(file_name))
+        with open(os.path.join(entry_path, 'meta.json'), encoding='utf-8') as file:
+            return entry_path, json.load(file)
+
+    def load_columns(self, file_name):
+        '''
+        Возвращает столбцы файла без разбора текста: числовые - как np.memmap,
+        строковые - как пара (коды np.memmap, список значений), код -1 означает пустое поле
+        :param file_name: путь к csv-файлу
+        :return: словарь (ключ - название столбца, значение - столбец)
+        '''
+        entry_path, meta = self.get_entry(file_name)
+        columns = {}
+        for number, column in enumerate(meta['columns']):
+            if column['kind'] == 'numeric':
+                columns[column['name']] = np.load(os.path.join(entry_path, f'{number}.npy'), mmap_mode='r')
+            else:
+                codes = np.load(os.path.join(entry_path, f'{number}.codes.npy'), mmap_mode='r')
+                values = np.load(os.path.join(entry_path, f'{number}.values.npy')).tolist()
+                columns[column['name']] = (codes, values)
+        return columns
+
+    def get_name_index(self, file_name):
+        '''
+        Возвращает индекс по названиям вакансий (NameIndex), который строится один раз и хранится в записи кэша.
+        Индекс пишется во временный каталог внутри записи и переименовывается целиком,
+        поэтому процесс, который видит каталог name_index, не прочитает недописанные файлы
+        :param file_name: путь к csv-файлу
+        :return: NameIndex
+        '''
+        entry_path, _ = self.get_entry(file_name)
+        directory = os.path.join(entry_path, 'name_index')
+        if os.path.isfile(os.path.join(directory, 'size.npy')):
+            return NameIndex.load(directory)
+        codes, names = self.load_columns(file_name)['name']
+        index = NameIndex.build(codes, names)
+        temp_path = tempfile.mkdtemp(dir=entry_path)
+        try:
+            index.save(temp_path)
+            try:
+                os.replace(temp_path, directory)
+            except OSError:
+                if not os.path.isfile(os.path.join(directory, 'size.npy')):
+                    raise
+        finally:
+            shutil.rmtree(temp_path, ignore_errors=True)
+        return index
+
+    def load(self, file_name):
+        '''
+        Возвращает содержимое файла в виде DataFrame, используя кэш
+        :param file_name: путь к csv-файлу
+        :return: DataFrame с вакансиями
+        '''
+        data = {}
+        for name, column in self.load_columns(file_name).items():
+            if isinstance(column, tuple):
+                codes, values = column
+                column = np.array(values + [np.nan], dtype=object)[codes]
+            data[name] = column
+        return pd.DataFrame(data)
+
+
+def read_vacancies(file_name, cache=None):
+    '''
+    Читает csv-файл с вакансиями через общий кэш
+    :param file_name: путь к csv-файлу
+    :param cache: кэш (VacancyCache), по умолчанию - каталог .vacancy_cache
+    :return: DataFrame с вакансиями
+    '''
+    return (cache or VacancyCache()).load(file_name)
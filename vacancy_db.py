@@ -0,0 +1,141 @@
+import sqlite3
+import pandas as pd
+from dates import get_year_numbers
+
+
+class VacancyDatabase:
+    ''' Класс VacancyDatabase хранит вакансии с уже посчитанной зарплатой в SQLite и отдает статистику для отчетов
+    Таблица имеет типизированные поля, первичный ключ и индексы по году и городу (по названию индекс не нужен:
+    профессия ищется функцией contains_ci, которая индекс не использует),
+    статистика считается заранее подготовленными агрегатными запросами. В запросе по годам признак профессии
+    считается один раз на строку в материализованном CTE, иначе SQLite вызывал бы contains_ci в каждом агрегате
+    Attributes:
+        connection (sqlite3.Connection): соединение с бд
+        table (str): название таблицы с вакансиями
+    '''
+    by_year_query = '''
+        with vacancies as materialized (select year, salary, contains_ci(name, :profession) as prof from {table})
+        select year, count(*), avg(salary), sum(prof), avg(case when prof then salary end)
+        from vacancies group by year order by year'''
+    by_year_for_area_query = '''
+        select year, avg(salary), count(*) from {table}
+        where area_name = :area and contains_ci(name, :profession) group by year order by year'''
+    by_city_query = '''
+        select area_name, count(*), avg(salary) from {table}
+        group by area_name order by count(*) desc, min(id)'''
+
+    def __init__(self, connection, table='YagodkinaVera'):
+        '''
+        Инициализирует класс VacancyDatabase
+        :param connection: соединение с бд (sqlite3.Connection) или путь к файлу бд
+        :param table: название таблицы с вакансиями
+        '''
+        self.connection = sqlite3.connect(connection) if isinstance(connection, str) else connection
+        self.table = table
+        self.connection.create_function('contains_ci', 2, self.contains_ci, deterministic=True)
+
+    @staticmethod
+    def contains_ci(name, profession):
+        '''
+        Проверяет вхождение профессии в название без учета регистра (lower в SQLite работает только с латиницей)
+        :param name: название вакансии
+        :param profession: название профессии
+        :return: 1 если профессия входит в название, иначе 0
+
+        >>> VacancyDatabase.contains_ci('Ведущий Аналитик', 'аналитик'), VacancyDatabase.contains_ci(None, 'аналитик')
+        (1, 0)
+        '''
+        return int(name is not None and profession.lower() in name.lower())
+
+    def create_table(self, replace=False):
+        '''
+        Создает таблицу с вакансиями
+        :param replace: удалить существующую таблицу
+        '''
+        if replace:
+            self.connection.execute(f'drop table if exists {self.table}')
+        self.connection.execute(f'''
+            create table if not exists {self.table} (
+                id integer primary key,
+                name text not null,
+                salary real,
+                area_name text,
+                published_at text not null,
+                year integer not null)''')
+
+    def create_indexes(self):
+        '''Создает индексы по году и городу (после загрузки данных это быстрее, чем до нее)'''
+        for column in ('year', 'area_name'):
+            self.connection.execute(f'create index if not exists {self.table}_{column} on {self.table} ({column})')
+        self.connection.commit()
+
+    def insert_frame(self, data, batch_size=100000):
+        '''
+        Добавляет вакансии в таблицу пачками
+        :param data: DataFrame с полями name, salary, area_name, published_at
+        :param batch_size: количество строк в одном executemany
+        '''
+        years = get_year_numbers(data['published_at']).astype(int)
+        data = data[['name', 'salary', 'area_name', 'published_at']].astype(object)
+        data = data.where(pd.notnull(data), None)
+        data['year'] = years
+        query = f'insert into {self.table} (name, salary, area_name, published_at, year) values (?, ?, ?, ?, ?)'
+        for start in range(0, data.shape[0], batch_size):
+            rows = data.iloc[start:start + batch_size].itertuples(index=False, name=None)
+            self.connection.executemany(query, rows)
+        self.connection.commit()
+
+    def load_csv(self, file_name, chunk_size=100000):
+        '''
+        Заполняет бд из csv-файла с конвертированной зарплатой (name, salary, area_name, published_at)
+        :param file_name: csv-файл
+        :param chunk_size: количество строк, читаемых за раз
+        '''
+        self.create_table(replace=True)
+        for data in pd.read_csv(file_name, chunksize=chunk_size):
+            self.insert_frame(data, chunk_size)
+        self.create_indexes()
+
+    def get_statistics_by_year(self, profession):
+        '''
+        Считает статистику по годам в формате 342.Report.get_file_analytic
+        :param profession: название профессии
+        :return: 4 словаря (ключ - год строкой): средняя зарплата, количество вакансий,
+            средняя зарплата и количество вакансий для профессии
+        '''
+        dict_salary, dict_count, dict_salary_prof, dict_count_prof = {}, {}, {}, {}
+        query = self.by_year_query.format(table=self.table)
+        for year, count, salary, count_prof, salary_prof in self.connection.execute(query, {'profession': profession}):
+            dict_salary[str(year)] = round(salary or 0)
+            dict_count[str(year)] = count
+            dict_salary_prof[str(year)] = round(salary_prof or 0)
+            dict_count_prof[str(year)] = count_prof
+        return dict_salary, dict_count, dict_salary_prof, dict_count_prof
+
+    def get_statistics_for_one(self, profession, area):
+        '''
+        Считает статистику по годам для профессии в городе в формате 343.Report.get_data_for_one
+        :param profession: название профессии
+        :param area: название города
+        :return: 2 словаря (ключ - год строкой): средняя зарплата и количество вакансий
+        '''
+        salary_prof, count = {}, {}
+        query = self.by_year_for_area_query.format(table=self.table)
+        for year, salary, amount in self.connection.execute(query, {'profession': profession, 'area': area}):
+            salary_prof[str(year)] = round(salary or 0)
+            count[str(year)] = amount
+        return salary_prof, count
+
+    def get_statistics_by_city(self):
+        '''
+        Считает статистику по городам в формате 343.Report.get_data_for_all_city
+        :return: 2 словаря с аналитикой по топ 10 городам: средняя зарплата и доля вакансий
+        '''
+        cities = self.connection.execute(self.by_city_query.format(table=self.table)).fetchall()
+        total = sum(count for _, count, _ in cities)
+        city_part = {city: round(count / total, 4) for city, count, _ in cities
+                     if city is not None and round(count / total, 4) > 0.01}
+        dict_part_city = dict(list(city_part.items())[:10])
+        salary_by_city = {city: round(salary) for city, _, salary in cities if city in city_part and salary is not None}
+        dict_sal_city = dict(sorted(salary_by_city.items(), key=lambda x: x[-1], reverse=True)[:10])
+        return dict_sal_city, dict_part_city
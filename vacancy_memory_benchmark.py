@@ -0,0 +1,84 @@
+import random
+import sys
+import tracemalloc
+from main import Salary, Vacancy, VacancyTable
+
+
+class DictSalary:
+    ''' Прежнее представление зарплаты: объект с __dict__ на каждую вакансию '''
+    def __init__(self, salary_from, salary_to, salary_currency):
+        self.salary_from = int(float(salary_from))
+        self.salary_to = int(float(salary_to))
+        self.salary_currency = salary_currency
+
+
+class DictVacancy:
+    ''' Прежнее представление вакансии: объект с __dict__ и отдельным объектом DictSalary '''
+    def __init__(self, dct):
+        self.name = dct['name']
+        self.salary = DictSalary(dct['salary_from'], dct['salary_to'], dct['salary_currency'])
+        self.area_name = dct['area_name']
+        self.published_at = dct['published_at']
+
+
+titles = ['name', 'salary_from', 'salary_to', 'salary_currency', 'area_name', 'published_at']
+
+
+def generate_rows(count, seed=0):
+    '''
+    Генерирует строки, похожие на выгрузку hh.ru: названия, города и даты публикации часто повторяются.
+    Каждая строка собирается заново и разбивается split, поэтому строки полей - отдельные объекты, как у csv.reader
+    :param count: количество строк
+    :param seed: зерно генератора случайных чисел
+    :return: генератор словарей с полями вакансии
+    '''
+    rnd = random.Random(seed)
+    names = [f'Программист {i}' for i in range(20000)] + [f'Аналитик {i}' for i in range(5000)]
+    areas = [f'Город {i}' for i in range(1000)] + ['Москва'] * 300 + ['Санкт-Петербург'] * 100
+    currencies = list(Salary.currency_to_rub)
+    dates = [f'{rnd.randint(2003, 2022)}-{rnd.randint(1, 12):02d}-{rnd.randint(1, 28):02d}T12:00:00+0300'
+             for _ in range(50000)]
+    for _ in range(count):
+        line = (f'{rnd.choice(names)};{rnd.randint(10, 300) * 1000}.0;{rnd.randint(300, 600) * 1000}.0;'
+                f'{rnd.choice(currencies)};{rnd.choice(areas)};{rnd.choice(dates)}')
+        yield dict(zip(titles, line.split(';')))
+
+
+def measure(build, count):
+    '''
+    Измеряет объем памяти, который занимает построенная структура
+    :param build: функция, строящая структуру из генератора строк
+    :param count: количество строк
+    :return: объем памяти в мегабайтах
+    '''
+    tracemalloc.start()
+    result = build(generate_rows(count))
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return size / 2 ** 20
+
+
+def build_dict_objects(rows):
+    return [DictVacancy(row) for row in rows]
+
+
+def build_slot_objects(rows):
+    return [Vacancy(row) for row in rows]
+
+
+def build_table(rows):
+    table = VacancyTable()
+    for row in rows:
+        table.append(row)
+    return table
+
+
+if __name__ == '__main__':
+    sizes = [int(size) for size in sys.argv[1:]] or [1_000_000, 10_000_000]
+    print(f'{"строк":>10} {"__dict__, МБ":>14} {"__slots__, МБ":>14} {"VacancyTable, МБ":>17}')
+    for count in sizes:
+        dict_size = measure(build_dict_objects, count)
+        slot_size = measure(build_slot_objects, count)
+        table_size = measure(build_table, count)
+        print(f'{count:>10} {dict_size:>14.1f} {slot_size:>14.1f} {table_size:>17.1f}')